@@ -5,7 +5,9 @@
 
 from typing import TYPE_CHECKING
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+
+from app.api.orjson_response import ORJSONResponse
 
 from app.schemas.api import (
     ConfigResponse,
@@ -16,26 +18,41 @@ from app.schemas.api import (
     UpdateConfigRequest,
     UpdateConfigResponse,
     LibrariesResponse,
+    ApiResponse,
+    PydanticResponse,
     success_response,
 )
 
 if TYPE_CHECKING:
     from app.core.config import Config
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 _config: "Config" = None
 
+# 配置仅通过 PUT /config 变更，响应模型缓存到失效为止
+_cached_config_response: ConfigResponse | None = None
+_cached_libraries_response: LibrariesResponse | None = None
+# GET /config 被前端轮询，连序列化结果一起缓存
+_cached_config_bytes: bytes | None = None
+
 
 def init_config_router(config: "Config"):
     global _config
     _config = config
+    _invalidate_config_cache()
 
 
-@router.get("/config")
-async def get_config():
-    libraries = [
-        LibraryItem(
+def _invalidate_config_cache():
+    global _cached_config_response, _cached_libraries_response, _cached_config_bytes
+    _cached_config_response = None
+    _cached_libraries_response = None
+    _cached_config_bytes = None
+
+
+def _build_library_items() -> list[LibraryItem]:
+    return [
+        LibraryItem.model_construct(
             name=lib.name,
             download_path=lib.download_path,
             target_path=lib.target_path,
@@ -45,25 +62,39 @@ async def get_config():
         for lib in _config.media.libraries
     ]
 
-    xx_config = XXConfigResponse(
-        remove_keywords=_config.media.xx.remove_keywords if _config.media.xx else []
-    )
 
-    return success_response(
-        data=ConfigResponse(
-            p115=P115ConfigResponse(
+@router.get("/config")
+async def get_config() -> ApiResponse[ConfigResponse]:
+    global _cached_config_response, _cached_config_bytes
+
+    if _cached_config_bytes is not None:
+        return Response(content=_cached_config_bytes, media_type="application/json")
+
+    if _cached_config_response is None:
+        xx_config = XXConfigResponse.model_construct(
+            remove_keywords=_config.media.xx.remove_keywords if _config.media.xx else []
+        )
+        _cached_config_response = ConfigResponse.model_construct(
+            p115=P115ConfigResponse.model_construct(
                 rotation_training_interval_min=_config.p115.rotation_training_interval_min,
                 rotation_training_interval_max=_config.p115.rotation_training_interval_max,
             ),
-            media=MediaConfigResponse(
+            media=MediaConfigResponse.model_construct(
                 min_transfer_size=_config.media.min_transfer_size,
                 video_formats=_config.media.video_formats,
-                libraries=libraries,
+                libraries=_build_library_items(),
                 xx=xx_config,
             ),
-        ),
+        )
+
+    # 跳过 jsonable_encoder：数据已是 Pydantic 模型，直接序列化返回
+    resp = ApiResponse.model_construct(
+        code=0,
         message="获取配置成功",
+        data=_cached_config_response,
     )
+    _cached_config_bytes = resp.model_dump_json().encode("utf-8")
+    return Response(content=_cached_config_bytes, media_type="application/json")
 
 
 @router.put("/config")
@@ -82,6 +113,8 @@ async def update_config(request: UpdateConfigRequest):
         if request.media.min_transfer_size is not None:
             _config.media.min_transfer_size = request.media.min_transfer_size
 
+    _invalidate_config_cache()
+
     return success_response(
         data=UpdateConfigResponse(message="配置更新成功"),
         message="配置更新成功",
@@ -89,19 +122,17 @@ async def update_config(request: UpdateConfigRequest):
 
 
 @router.get("/libraries")
-async def get_libraries():
-    libraries = [
-        LibraryItem(
-            name=lib.name,
-            download_path=lib.download_path,
-            target_path=lib.target_path,
-            type=lib.type,
-            min_transfer_size=lib.min_transfer_size,
+async def get_libraries() -> ApiResponse[LibrariesResponse]:
+    global _cached_libraries_response
+
+    if _cached_libraries_response is None:
+        _cached_libraries_response = LibrariesResponse.model_construct(
+            libraries=_build_library_items()
         )
-        for lib in _config.media.libraries
-    ]
 
-    return success_response(
-        data=LibrariesResponse(libraries=libraries),
+    resp = ApiResponse.model_construct(
+        code=0,
         message="获取媒体库列表成功",
+        data=_cached_libraries_response,
     )
+    return PydanticResponse(content=resp)
@@ -6,54 +6,81 @@
 from typing import Optional
 
 from fastapi import APIRouter, Query
+
 from sqlalchemy import select, func
 
-from app.core.database import get_session
+from app.api.orjson_response import ORJSONResponse
+from app.core.database import engine
 from app.models.organize_record import OrganizeRecord
 from app.schemas.api import (
     ApiResponse,
     OrganizeRecordItem,
     OrganizeRecordsResponse,
-    success_response,
+    PydanticResponse,
 )
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
-@router.get("/organize/records", response_model=ApiResponse[OrganizeRecordsResponse])
+@router.get("/organize/records")
 async def get_organize_records(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
     status: Optional[str] = Query(None, description="筛选状态"),
-):
-    async with get_session() as session:
-        count_stmt = select(func.count()).select_from(OrganizeRecord)
-        if status:
-            count_stmt = count_stmt.where(OrganizeRecord.status == status)
-        count_result = await session.execute(count_stmt)
-        total = count_result.scalar()
-
-        stmt = select(OrganizeRecord).order_by(OrganizeRecord.created_at.desc())
-        if status:
-            stmt = stmt.where(OrganizeRecord.status == status)
+    cursor: Optional[int] = Query(None, description="游标（上一页最后一条记录的 ID）"),
+    include_total: bool = Query(False, description="是否统计总数（额外一次 COUNT 查询）"),
+) -> ApiResponse[OrganizeRecordsResponse]:
+    total = None
+
+    # 只读查询：选具体列拿 Row 元组，跳过 ORM 对象和 identity map 的构建
+    columns = (
+        OrganizeRecord.id,
+        OrganizeRecord.file_name,
+        OrganizeRecord.source_path,
+        OrganizeRecord.target_path,
+        OrganizeRecord.status,
+        OrganizeRecord.created_at,
+    )
+
+    # 总数通过窗口函数随行内联返回，避免独立的 COUNT round-trip
+    if include_total:
+        stmt = select(*columns, func.count().over().label("full_count"))
+    else:
+        stmt = select(*columns)
+
+    # id 自增且与 created_at 同序，按 id 做 keyset 分页避免 OFFSET 线性扫描
+    stmt = stmt.order_by(OrganizeRecord.created_at.desc(), OrganizeRecord.id.desc())
+    if status:
+        stmt = stmt.where(OrganizeRecord.status == status)
+    if cursor is not None:
+        stmt = stmt.where(OrganizeRecord.id < cursor).limit(page_size)
+    else:
         stmt = stmt.offset((page - 1) * page_size).limit(page_size)
 
-        result = await session.execute(stmt)
-        records = result.scalars().all()
-
-        record_items = [
-            OrganizeRecordItem(
-                id=record.id,
-                file_name=record.file_name or "",
-                source_path=record.source_path or "",
-                target_path=record.target_path or "",
-                status=record.status or "",
-                created_at=record.created_at,
-            )
-            for record in records
-        ]
-
-        return success_response(
-            data=OrganizeRecordsResponse(total=total, records=record_items),
-            message="获取整理记录成功",
+    # 只读路径不需要 AsyncSession，直接用引擎连接执行
+    async with engine.connect() as conn:
+        result = await conn.execute(stmt)
+        rows = result.all()
+
+    if include_total:
+        total = rows[0].full_count if rows else 0
+
+    record_items = [
+        OrganizeRecordItem.model_construct(
+            id=row.id,
+            file_name=row.file_name or "",
+            source_path=row.source_path or "",
+            target_path=row.target_path or "",
+            status=row.status or "",
+            created_at=row.created_at,
         )
+        for row in rows
+    ]
+
+    # 跳过 jsonable_encoder：数据已是 Pydantic 模型，直接序列化返回
+    resp = ApiResponse.model_construct(
+        code=0,
+        message="获取整理记录成功",
+        data=OrganizeRecordsResponse.model_construct(total=total, records=record_items),
+    )
+    return PydanticResponse(content=resp)
@@ -3,28 +3,38 @@
 @responsibility 处理系统状态和监控任务状态的查询
 """
 
+import asyncio
+import time
 from typing import TYPE_CHECKING, Optional
 from datetime import datetime
 
 from fastapi import APIRouter
 
-from app.schemas.api import StatusResponse, success_response, ApiResponse
+from app.api.orjson_response import ORJSONResponse
+
+from app.schemas.api import StatusResponse, ApiResponse, PydanticResponse
 
 if TYPE_CHECKING:
     from app.tasks.monitor import TaskMonitor
     from app.services.p115_client import P115Client
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 _task_monitor: Optional["TaskMonitor"] = None
 _p115_client: Optional["P115Client"] = None
 _last_check_time: Optional[datetime] = None
 
+# /status 被前端高频轮询，活跃任务数短暂缓存避免每次都打 115 API
+_ACTIVE_TASKS_TTL = 5.0
+_active_tasks_cache: Optional[tuple[int, float]] = None
+_active_tasks_lock = asyncio.Lock()
+
 
 def init_system_router(task_monitor: "TaskMonitor", p115_client: "P115Client"):
-    global _task_monitor, _p115_client
+    global _task_monitor, _p115_client, _active_tasks_cache
     _task_monitor = task_monitor
     _p115_client = p115_client
+    _active_tasks_cache = None
 
 
 def update_last_check_time():
@@ -32,17 +42,24 @@ def update_last_check_time():
     _last_check_time = datetime.now()
 
 
-@router.get("/status", response_model=ApiResponse[StatusResponse])
-async def get_status():
-    monitor_running = False
-    if _task_monitor is not None:
-        if hasattr(_task_monitor, "_task") and _task_monitor._task is not None:
-            monitor_running = not _task_monitor._task.done()
-        elif hasattr(_task_monitor, "_stop_event"):
-            monitor_running = not _task_monitor._stop_event.is_set()
+async def _get_active_tasks() -> int:
+    """获取活跃任务数（带 TTL 缓存，并发刷新只触发一次上游调用）"""
+    global _active_tasks_cache
+
+    if _p115_client is None:
+        return 0
 
-    active_tasks = 0
-    if _p115_client is not None:
+    now = time.monotonic()
+    if _active_tasks_cache is not None and now - _active_tasks_cache[1] < _ACTIVE_TASKS_TTL:
+        return _active_tasks_cache[0]
+
+    async with _active_tasks_lock:
+        # 等锁期间可能已被其他请求刷新
+        now = time.monotonic()
+        if _active_tasks_cache is not None and now - _active_tasks_cache[1] < _ACTIVE_TASKS_TTL:
+            return _active_tasks_cache[0]
+
+        active_tasks = 0
         try:
             result = await _p115_client.get_offline_tasks()
             if result.get("state"):
@@ -51,11 +68,28 @@ async def get_status():
         except Exception:
             pass
 
-    return success_response(
+        _active_tasks_cache = (active_tasks, time.monotonic())
+        return active_tasks
+
+
+@router.get("/status")
+async def get_status() -> ApiResponse[StatusResponse]:
+    monitor_running = False
+    if _task_monitor is not None:
+        if hasattr(_task_monitor, "_task") and _task_monitor._task is not None:
+            monitor_running = not _task_monitor._task.done()
+        elif hasattr(_task_monitor, "_stop_event"):
+            monitor_running = not _task_monitor._stop_event.is_set()
+
+    active_tasks = await _get_active_tasks()
+
+    resp = ApiResponse.model_construct(
+        code=0,
+        message="获取系统状态成功",
         data=StatusResponse(
             monitor_running=monitor_running,
             active_tasks=active_tasks,
             last_check_time=_last_check_time.isoformat() if _last_check_time else None,
         ),
-        message="获取系统状态成功",
     )
+    return PydanticResponse(content=resp)
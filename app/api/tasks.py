@@ -3,13 +3,16 @@
 @responsibility 处理离线任务的添加、查询、删除操作
 """
 
+import asyncio
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from fastapi import APIRouter, HTTPException, Depends
+
 from loguru import logger
-from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
+from app.api.orjson_response import ORJSONResponse
 from app.schemas.api import (
     AddTaskRequest,
     AddTaskResponse,
@@ -17,33 +20,117 @@ from app.schemas.api import (
     TaskListResponse,
     TaskDetailResponse,
     DeleteTaskResponse,
+    ApiResponse,
+    PydanticResponse,
     success_response,
 )
 from app.models.offline_task import OfflineTask
 from app.core.database import get_session
+from app.tasks.monitor import TaskMonitor
 from app.utils.helpers import parse_info_hash_from_magnet
 
 if TYPE_CHECKING:
     from app.services.p115_client import P115Client
     from app.core.config import Config
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 _p115_client: "P115Client" = None
 _config: "Config" = None
+_library_by_name: dict = {}
 
 
 def init_tasks_router(p115_client: "P115Client", config: "Config"):
-    global _p115_client, _config
+    global _p115_client, _config, _library_by_name
     _p115_client = p115_client
     _config = config
+    # 媒体库配置在启动后不变，预建 name -> library 索引避免每次请求线性扫描
+    _library_by_name = {lib.name: lib for lib in config.media.libraries}
 
 
 def _find_library_by_name(name: str):
-    for library in _config.media.libraries:
-        if library.name == name:
-            return library
-    return None
+    return _library_by_name.get(name)
+
+
+# 任务记录写入经后台队列批量落库，突发请求不再逐个等待 commit/fsync
+_WRITE_BATCH_SIZE = 50
+_WRITE_FLUSH_INTERVAL = 0.2
+_write_queue: Optional[asyncio.Queue] = None
+_writer_task: Optional[asyncio.Task] = None
+
+
+def _enqueue_task_record(record: dict) -> None:
+    """将任务记录放入写入队列（按需启动后台写入循环）"""
+    global _write_queue, _writer_task
+
+    loop = asyncio.get_running_loop()
+    if (
+        _writer_task is None
+        or _writer_task.done()
+        or _writer_task.get_loop() is not loop
+    ):
+        _write_queue = asyncio.Queue()
+        _writer_task = loop.create_task(_db_writer_loop())
+
+    _write_queue.put_nowait(record)
+
+
+async def _db_writer_loop() -> None:
+    """后台写入循环：攒批后单事务 UPSERT，均摊 commit 开销"""
+    while True:
+        records = [await _write_queue.get()]
+        try:
+            while len(records) < _WRITE_BATCH_SIZE:
+                records.append(
+                    await asyncio.wait_for(
+                        _write_queue.get(), timeout=_WRITE_FLUSH_INTERVAL
+                    )
+                )
+        except asyncio.TimeoutError:
+            pass
+
+        try:
+            async with get_session() as session:
+                for record in records:
+                    stmt = sqlite_insert(OfflineTask).values(**record)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=["info_hash"],
+                        set_={
+                            "name": record["name"],
+                            "library_name": record["library_name"],
+                            "status": record["status"],
+                        },
+                    )
+                    await session.execute(stmt)
+                await session.commit()
+            logger.debug(f"批量写入 {len(records)} 条离线任务记录")
+        except Exception as e:
+            # 数据库写入失败不影响接口返回，与原行为一致
+            logger.error(f"批量保存离线任务失败: {e}")
+        finally:
+            # 无论写入成败都结清本批配额，drain_writer 的 join 才能返回
+            for _ in records:
+                _write_queue.task_done()
+
+
+async def drain_writer() -> None:
+    """应用关闭时冲刷写入队列：剩余记录全部落库后再停掉写入循环
+
+    不冲刷的话，攒批窗口（≤0.2s）内的记录会随关闭静默丢失，
+    监控之后就查不到该任务的 library_name，下载完成也不会被整理
+    """
+    global _writer_task
+
+    if _writer_task is None or _writer_task.done():
+        return
+
+    await _write_queue.join()
+    _writer_task.cancel()
+    try:
+        await _writer_task
+    except asyncio.CancelledError:
+        pass
+    _writer_task = None
 
 
 @router.post("/tasks")
@@ -87,38 +174,19 @@ async def add_task(request: AddTaskRequest):
     logger.info(f"API info_hash: {api_info_hash}")
     logger.info(f"最终 info_hash: {final_info_hash}")
 
-    # 保存到数据库（info_hash 可能为 None）
-    try:
-        async with get_session() as session:
-            # 查询是否存在相同 info_hash 的任务
-            result = await session.execute(
-                select(OfflineTask).where(OfflineTask.info_hash == final_info_hash)
-            )
-            existing_task = result.scalar_one_or_none()
-
-            if existing_task:
-                # 存在则更新字段
-                existing_task.library_name = library.name
-                existing_task.name = (
-                    request.name if request.name else request.magnet[:50]
-                )
-                existing_task.status = "added"
-                logger.info(f"离线任务已更新: info_hash={final_info_hash}")
-            else:
-                # 不存在则创建新记录
-                offline_task = OfflineTask(
-                    info_hash=final_info_hash,
-                    name=request.name if request.name else request.magnet[:50],
-                    library_name=library.name,
-                    status="added",
-                )
-                session.add(offline_task)
-                logger.info(f"离线任务已保存到数据库: info_hash={final_info_hash}")
-
-            await session.commit()
-    except Exception as e:
-        # 数据库保存失败不影响 API 返回成功
-        logger.error(f"保存离线任务失败: {e}")
+    # 保存到数据库（info_hash 可能为 None），经后台队列批量 UPSERT
+    task_name = request.name if request.name else request.magnet[:50]
+    _enqueue_task_record(
+        {
+            "info_hash": final_info_hash,
+            "name": task_name,
+            "library_name": library.name,
+            "status": "added",
+        }
+    )
+    logger.info(f"离线任务已加入写入队列: info_hash={final_info_hash}")
+    # 通知监控循环有新任务，结束其空闲短路
+    TaskMonitor.notify_task_added()
 
     # 返回最终的 info_hash（None 时返回空字符串避免 API 响应为 null）
     return success_response(
@@ -128,27 +196,32 @@ async def add_task(request: AddTaskRequest):
 
 
 @router.get("/tasks")
-async def get_tasks():
+async def get_tasks() -> ApiResponse[TaskListResponse]:
     result = await _p115_client.get_offline_tasks()
     if not result.get("state"):
         raise HTTPException(status_code=500, detail="获取任务列表失败")
 
     tasks = result.get("tasks") or []
+    # 热循环内避免重复的属性查找
+    _fromtimestamp = datetime.fromtimestamp
     task_items = [
-        TaskItem(
+        TaskItem.model_construct(
             task_id=task.get("info_hash", ""),
             name=task.get("name", ""),
             status=task.get("status", 0),
             progress=task.get("percent_done", 0),
-            add_time=datetime.fromtimestamp(task.get("add_time", 0)),
+            add_time=_fromtimestamp(task.get("add_time", 0)),
         )
         for task in tasks
     ]
 
-    return success_response(
-        data=TaskListResponse(total=len(task_items), tasks=task_items),
+    # 跳过 jsonable_encoder：数据已是 Pydantic 模型，直接序列化返回
+    resp = ApiResponse.model_construct(
+        code=0,
         message="获取任务列表成功",
+        data=TaskListResponse.model_construct(total=len(task_items), tasks=task_items),
     )
+    return PydanticResponse(content=resp)
 
 
 @router.get("/tasks/{task_id}")
@@ -5,9 +5,17 @@
 
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 import yaml
+
+try:
+    # C 扩展解析比纯 Python SafeLoader 快一个数量级
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -63,9 +71,12 @@ def get_config_path() -> Path:
     return Path(__file__).parent.parent.parent / "config.yaml"
 
 
-def load_config() -> Config:
-    """加载配置文件并应用环境变量覆盖"""
-    config_path = get_config_path()
+# 缓存键包含路径与 cookies 覆盖值，环境变量变化时自然落到新条目；
+# 异常（模板生成退出、验证失败）不会被 lru_cache 缓存
+@lru_cache(maxsize=4)
+def _load_config_cached(config_path_str: str, cookies_override: str | None) -> Config:
+    """按（路径, cookies 覆盖）解析并缓存配置"""
+    config_path = Path(config_path_str)
 
     # 配置文件不存在时生成模板并退出
     if not config_path.exists():
@@ -76,18 +87,25 @@ def load_config() -> Config:
 
     # 加载 YAML 配置
     with open(config_path) as f:
-        config_data = yaml.safe_load(f)
+        config_data = yaml.load(f, Loader=SafeLoader)
 
     # 解析为 Pydantic 模型（验证数据结构）
     config = Config(**config_data)
 
     # 应用环境变量覆盖
-    if cookies := os.environ.get("P115_COOKIES"):
-        config.p115.cookies = cookies
+    if cookies_override:
+        config.p115.cookies = cookies_override
 
     return config
 
 
+def load_config() -> Config:
+    """加载配置文件并应用环境变量覆盖（同一路径与覆盖值只解析一次）"""
+    return _load_config_cached(
+        str(get_config_path()), os.environ.get("P115_COOKIES")
+    )
+
+
 def _generate_config_template(config_path: Path) -> None:
     """生成配置模板文件"""
     template_path = config_path.parent / "config.example.yaml"
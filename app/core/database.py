@@ -3,8 +3,9 @@
 @responsibility 提供 SQLAlchemy 异步引擎、会话管理和数据库初始化
 """
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from contextlib import asynccontextmanager
 
 DATABASE_URL = "sqlite+aiosqlite:///./db/data.db"
@@ -12,12 +13,31 @@ DATABASE_URL = "sqlite+aiosqlite:///./db/data.db"
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,
-    connect_args={"check_same_thread": False},
+    pool_size=1,
+    max_overflow=0,
+    pool_pre_ping=False,
+    connect_args={"check_same_thread": False, "timeout": 30},
 )
 
-async_session_local = sessionmaker(
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragma(dbapi_conn, _connection_record):
+    """连接建立时设置 SQLite PRAGMA
+
+    WAL + synchronous=NORMAL 允许读写并发（监控写入与接口查询互不阻塞），
+    temp_store/mmap 减少临时表和页缓存的磁盘 IO
+    """
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.close()
+
+# async_sessionmaker 原生适配异步引擎，免去 legacy sessionmaker 的同步桥接包装
+async_session_local = async_sessionmaker(
     engine,
-    class_=AsyncSession,
     expire_on_commit=False,
 )
 
@@ -5,7 +5,6 @@
 
 from sqlalchemy import Column, Integer, String, DateTime, Text
 from sqlalchemy.sql import func
-from datetime import datetime
 from app.core.database import Base
 
 
@@ -26,5 +25,6 @@ class OfflineTask(Base):
     add_time = Column(DateTime)
     complete_time = Column(DateTime, nullable=True)
     error_message = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.now)
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    # 时间戳由数据库端 CURRENT_TIMESTAMP 计算，避免每行回调 Python
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
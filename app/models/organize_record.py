@@ -3,9 +3,8 @@
 @responsibility 记录文件整理操作的完整信息
 """
 
-from sqlalchemy import Column, Integer, String, BigInteger, DateTime, Text
+from sqlalchemy import Column, Integer, String, BigInteger, DateTime, Text, Index
 from sqlalchemy.sql import func
-from datetime import datetime
 from app.core.database import Base
 
 
@@ -21,4 +20,12 @@ class OrganizeRecord(Base):
     library_name = Column(String(255))
     status = Column(String(50))
     error_message = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.now)
+    # 时间戳由数据库端 CURRENT_TIMESTAMP 计算，避免每行回调 Python
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # keyset 分页按 (created_at, id) 倒序扫描
+        Index("ix_organize_record_created_at_id", "created_at", "id"),
+        # 按状态筛选 + created_at 排序的列表查询走索引范围扫描，省去 filesort
+        Index("ix_organize_status_created", "status", "created_at"),
+    )
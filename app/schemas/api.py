@@ -5,6 +5,8 @@
 
 from datetime import datetime
 from typing import Optional
+
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
 
@@ -58,7 +60,7 @@ class OrganizeRecordItem(BaseModel):
 
 
 class OrganizeRecordsResponse(BaseModel):
-    total: int = Field(..., description="记录总数")
+    total: Optional[int] = Field(None, description="记录总数（仅 include_total=true 时统计）")
     records: list[OrganizeRecordItem] = Field(..., description="整理记录列表")
 
 
@@ -144,11 +146,30 @@ class ApiResponse(BaseModel, Generic[T]):
     data: Optional[T] = Field(None, description="响应数据")
 
 
-def success_response(data: T, message: str = "操作成功") -> ApiResponse[T]:
-    """创建成功响应"""
-    return ApiResponse(code=0, message=message, data=data)
+class PydanticResponse(JSONResponse):
+    """直接序列化 Pydantic 模型的响应
+
+    跳过 FastAPI 的 jsonable_encoder 和 response_model 二次验证，
+    由 Pydantic 直接输出 JSON 字节，减少热点接口的序列化开销
+    """
+
+    def render(self, content: BaseModel) -> bytes:
+        return content.model_dump_json().encode("utf-8")
+
+
+def success_response(data: T, message: str = "操作成功") -> dict:
+    """创建成功响应
+
+    返回普通 dict 而非 ApiResponse 实例，避免每次请求实例化
+    Pydantic 泛型模型；ApiResponse 保留用于 OpenAPI 文档和直接序列化路径
+    """
+    if isinstance(data, BaseModel):
+        data = data.model_dump()
+    return {"code": 0, "message": message, "data": data}
 
 
-def error_response(code: int, message: str, data: Optional[T] = None) -> ApiResponse[T]:
+def error_response(code: int, message: str, data: Optional[T] = None) -> dict:
     """创建错误响应"""
-    return ApiResponse(code=code, message=message, data=data)
+    if isinstance(data, BaseModel):
+        data = data.model_dump()
+    return {"code": code, "message": message, "data": data}
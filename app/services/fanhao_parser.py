@@ -4,17 +4,30 @@
 """
 
 import re
+from functools import lru_cache
 from pathlib import Path
 
 
 FANHAO_PATTERN = re.compile(r"(?<![A-Z0-9])[A-Z]{2,10}-\d{3,5}(?!\d)")
 
+# CD 后缀映射表（模块级常量，避免每次调用重建 dict）
+_LETTER_ORDER = {"A": 1, "B": 2, "C": 3, "D": 4, "U": 1}
+_NUMERIC_MAPPING = {"1": "CD1", "2": "CD2", "3": "CD3", "4": "CD4"}
+_PART_MAPPING = {"PART1": "CD1", "PART2": "CD2", "PART3": "CD3", "PART4": "CD4"}
+
+
+@lru_cache(maxsize=64)
+def _keywords_pattern(keywords: tuple[str, ...]) -> re.Pattern:
+    """按关键词元组缓存编译后的替换正则（长词优先，避免被短词截断）"""
+    ordered = sorted(keywords, key=len, reverse=True)
+    return re.compile("|".join(re.escape(k) for k in ordered))
+
 
 def remove_keywords(filename: str, keywords: list[str]) -> str:
-    result = filename
-    for keyword in keywords:
-        result = result.replace(keyword, "")
-    return result
+    # 单次正则扫描替代逐关键词 str.replace，省去 K 次全串遍历和中间字符串
+    if not keywords:
+        return filename
+    return _keywords_pattern(tuple(keywords)).sub("", filename)
 
 
 def normalize_filename(filename: str) -> str:
@@ -28,10 +41,12 @@ def normalize_filename(filename: str) -> str:
 
 
 def extract_fanhao(filename: str) -> str | None:
+    # 番号必含横杠，先做 O(n) 字节扫描预过滤，无横杠直接跳过正则
+    if "-" not in filename:
+        return None
+
     match = FANHAO_PATTERN.search(filename)
-    if match:
-        return match.group()
-    return None
+    return match.group() if match else None
 
 
 def normalize_cd_suffix(filename: str, file_count: int) -> str:
@@ -47,24 +62,19 @@ def normalize_cd_suffix(filename: str, file_count: int) -> str:
     if "-" not in name:
         return filename
 
-    suffix = name.split("-")[-1]
-
-    letter_order = {"A": 1, "B": 2, "C": 3, "D": 4, "U": 1}
-    numeric_mapping = {"1": "CD1", "2": "CD2", "3": "CD3", "4": "CD4"}
-    part_mapping = {"PART1": "CD1", "PART2": "CD2", "PART3": "CD3", "PART4": "CD4"}
-
-    base_name = "-".join(name.split("-")[:-1])
+    # rsplit 一次分割同时得到 base_name 和 suffix，免去中间列表
+    base_name, suffix = name.rsplit("-", 1)
 
-    if suffix in letter_order:
-        order_num = letter_order[suffix]
+    if suffix in _LETTER_ORDER:
+        order_num = _LETTER_ORDER[suffix]
         if order_num <= file_count:
             return f"{base_name}-CD{order_num}.{ext}"
         else:
             return f"{base_name}-CD1.{ext}"
-    elif suffix in numeric_mapping:
-        return f"{base_name}-{numeric_mapping[suffix]}.{ext}"
-    elif suffix in part_mapping:
-        return f"{base_name}-{part_mapping[suffix]}.{ext}"
+    elif suffix in _NUMERIC_MAPPING:
+        return f"{base_name}-{_NUMERIC_MAPPING[suffix]}.{ext}"
+    elif suffix in _PART_MAPPING:
+        return f"{base_name}-{_PART_MAPPING[suffix]}.{ext}"
 
     return filename
 
@@ -79,7 +89,9 @@ def generate_target_path(filename: str, target_dir: str, producer: str) -> str:
     return f"{target_dir}/{producer}/{fanhao}/{filename}"
 
 
+@lru_cache(maxsize=64)
 def extract_producer(library_type: str) -> str | None:
+    # library_type 来自配置、取值有限，缓存后同一媒体库的重复任务只解析一次
     if not library_type or not library_type.startswith("xx-"):
         return None
 
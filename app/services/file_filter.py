@@ -4,23 +4,36 @@
 """
 
 
-def is_video_file(filename: str, formats: list[str]) -> bool:
+def get_file_size(file: dict) -> int:
+    """
+    读取文件大小（字节）
+
+    115 API 不同接口的大小字段不统一（s/sz/size），统一在此做回退，
+    避免各调用点重复三次 dict 查找且回退顺序不一致
+
+    Args:
+        file: 115 API 返回的文件字典
+
+    Returns:
+        文件大小（字节），字段缺失时返回 0
+    """
+    return file.get("s") or file.get("sz") or file.get("size") or 0
+
+
+def is_video_file(filename: str, formats) -> bool:
     """
     判断文件是否为支持的视频格式
 
     Args:
         filename: 文件名称
-        formats: 支持的视频格式列表（不含点号，如 ['mp4', 'mkv']）
+        formats: 支持的视频格式集合或列表（不含点号，如 {'mp4', 'mkv'}）
 
     Returns:
         True 表示为支持的视频文件，False 表示不支持或非视频文件
     """
-    # 提取文件扩展名（最后一个点之后的部分）
-    if "." not in filename:
-        return False
-
-    extension = filename.rsplit(".", 1)[-1].lower()
-    return extension in formats
+    # rpartition 单次扫描提取扩展名；sep 为空说明没有点号
+    _, sep, extension = filename.rpartition(".")
+    return bool(sep) and extension.lower() in formats
 
 
 def meets_size_requirement(size_bytes: int, min_size_mb: int) -> bool:
@@ -35,11 +48,10 @@ def meets_size_requirement(size_bytes: int, min_size_mb: int) -> bool:
         True 表示满足或超过最小大小，False 表示未达到最小大小
     """
     # 将 MB 转换为字节（1 MB = 1024 * 1024 bytes）
-    min_size_bytes = min_size_mb * 1024 * 1024
-    return size_bytes >= min_size_bytes
+    return size_bytes >= min_size_mb * 1024 * 1024
 
 
-def filter_files(files: list[dict], config: dict) -> list[dict]:
+def filter_files(files: list[dict], config: dict, return_skipped: bool = False):
     """
     过滤文件列表，返回符合条件的文件（同时满足格式和大小要求）
 
@@ -48,28 +60,48 @@ def filter_files(files: list[dict], config: dict) -> list[dict]:
         config: 配置字典，需要包含以下字段：
             - video_formats: 支持的视频格式列表
             - min_transfer_size: 最小文件大小（MB）
+        return_skipped: True 时额外返回被跳过文件的 "文件名 (原因)" 列表
 
     Returns:
-        过滤后的文件列表，保留原始文件字典的所有字段
+        过滤后的文件列表（保留原始文件字典的所有字段）；
+        return_skipped=True 时返回 (保留列表, 跳过列表) 元组
     """
     video_formats = config.get("video_formats", [])
-    min_transfer_size = config.get("min_transfer_size", 0)
+    # 扩展名拼成带点元组，循环内用单次 C 级 endswith 扫描替代切分+转小写+查集合
+    ext_tuple = tuple(f".{e.lower()}" for e in video_formats)
+    # 阈值在任务内不变，循环外转一次字节数，循环内只剩整数比较
+    min_size_bytes = config.get("min_transfer_size", 0) * 1024 * 1024
 
     result = []
+    skipped = []
     for file in files:
         # 115 API fs_files 返回字段: n=文件名, s=文件大小, fid=文件ID(仅文件有), cid=目录ID
         # 通过 fid 是否存在判断：目录没有 fid 字段，文件有 fid 字段
-        file_name = file.get("n", "")
-        file_size = file.get("s", 0) or file.get("sz", 0) or file.get("size", 0)
-        is_directory = "fid" not in file  # 目录没有 fid 字段
+        # organize_task 已在入口预计算 _name/_size/_is_dir，未归一化的输入走原字段
+        if "_name" in file:
+            file_name = file["_name"]
+            file_size = file["_size"]
+            is_directory = file["_is_dir"]
+        else:
+            file_name = file.get("n", "")
+            file_size = get_file_size(file)
+            is_directory = "fid" not in file
 
         if is_directory:
             # 跳过目录
+            if return_skipped:
+                skipped.append(f"{file_name} (目录)")
             continue
 
-        if is_video_file(file_name, video_formats) and meets_size_requirement(
-            file_size, min_transfer_size
-        ):
+        # 整数比较先行短路：大小不达标的文件省掉 lower()+endswith 的字符串开销
+        ok_size = file_size >= min_size_bytes
+        if ok_size and file_name.lower().endswith(ext_tuple):
             result.append(file)
+        elif return_skipped:
+            is_video = file_name.lower().endswith(ext_tuple)
+            reason = "格式不匹配" if not is_video else "大小不满足"
+            skipped.append(f"{file_name} ({reason})")
 
+    if return_skipped:
+        return result, skipped
     return result
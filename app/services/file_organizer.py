@@ -4,13 +4,15 @@
 """
 
 import asyncio
+import traceback
+from collections import Counter
 from typing import Optional
 
 from loguru import logger
 
 from app.core.database import get_session
 from app.models.organize_record import OrganizeRecord
-from app.services.file_filter import filter_files, is_video_file, meets_size_requirement
+from app.services.file_filter import filter_files, get_file_size
 from app.services.fanhao_parser import (
     remove_keywords,
     normalize_filename,
@@ -21,12 +23,21 @@ from app.services.fanhao_parser import (
 )
 
 
+def _debug_enabled() -> bool:
+    """DEBUG 级别是否会被记录（用于跳过仅供调试的统计与遍历）"""
+    return logger._core.min_level <= 10
+
+
 class FileOrganizer:
     """文件整理服务"""
 
     def __init__(self, p115_client):
         self._client = p115_client
         self._lock = asyncio.Lock()
+        # 整理记录先缓冲，任务结束时单事务批量落库
+        self._pending_records: list[dict] = []
+        # download_path_id -> {子目录名: cid}，同一下载目录的后续任务免去父目录重查
+        self._parent_dir_cache: dict[str, dict[str, str]] = {}
 
     async def organize_task(
         self,
@@ -47,9 +58,6 @@ class FileOrganizer:
         Returns:
             整理结果统计 {success_count, failed_count, skipped_count, errors}
         """
-        # 添加调试日志
-        import traceback
-
         # 初始化结果变量
         result = {
             "success_count": 0,
@@ -58,12 +66,28 @@ class FileOrganizer:
             "errors": [],
         }
 
-        logger.debug(f"[organize_task] task_info keys: {list(task_info.keys())}")
-        logger.debug(
-            f"[organize_task] library_config keys: {list(library_config.keys())}"
+        # keys 列表仅调试需要，lazy 模式下 INFO 级别不做任何格式化
+        logger.opt(lazy=True).debug(
+            "[organize_task] task_info keys: {k}", k=lambda: list(task_info.keys())
+        )
+        logger.opt(lazy=True).debug(
+            "[organize_task] library_config keys: {k}",
+            k=lambda: list(library_config.keys()),
         )
 
         try:
+            # 配置在整个任务内不变，一次解析成局部变量，后续不再穿透 dict 反复读取
+            library_type = library_config.get("type", "system")
+            target_path = library_config["target_path"]
+            filter_config = {
+                "video_formats": frozenset(
+                    f.lower() for f in media_config.get("video_formats", [])
+                ),
+                "min_transfer_size": library_config.get(
+                    "min_transfer_size", media_config.get("min_transfer_size", 0)
+                ),
+            }
+
             async with self._lock:
                 logger.debug(f"[organize_task-1] 获取 task_id 和 path_id")
                 task_id = task_info["task_id"]
@@ -83,29 +107,28 @@ class FileOrganizer:
                     return result
 
                 # 添加原始响应日志
-                logger.debug(
-                    f"[organize_task-2c] list_directory 原始响应 keys: {list(dir_response.keys())}"
+                logger.opt(lazy=True).debug(
+                    "[organize_task-2c] list_directory 原始响应 keys: {k}",
+                    k=lambda: list(dir_response.keys()),
                 )
                 raw_files = dir_response.get("data", [])
                 logger.debug(
                     f"[organize_task-2d] list_directory 返回的文件数量: {len(raw_files)}"
                 )
 
-                # 打印原始文件的 m 字段值分布
-                m_values = {}
-                for f in raw_files:
-                    m = f.get("m", "N/A")
-                    m_values[m] = m_values.get(m, 0) + 1
-                logger.debug(f"[organize_task-2e] m 字段值分布: {m_values}")
-
-                # 显示每个文件的原始数据
-                for i, f in enumerate(raw_files[:3]):
-                    file_name = f.get("n", "")
-                    file_size = f.get("s", 0)
-                    is_dir = "fid" not in f
-                    logger.debug(
-                        f"[organize_task-2f] list_directory 原始文件{i + 1}: {file_name} (大小: {file_size}, m={f.get('m')})"
-                    )
+                # m 字段分布统计与前 3 个文件打印都是 O(N) 的纯调试工作，
+                # 仅在 DEBUG 生效时执行，INFO 级别完全跳过
+                if _debug_enabled():
+                    # Counter 在 C 层完成累加，替代逐元素 get/+1 的两次 dict 查找
+                    m_values = Counter(f.get("m", "N/A") for f in raw_files)
+                    logger.debug(f"[organize_task-2e] m 字段值分布: {dict(m_values)}")
+
+                    for i, f in enumerate(raw_files[:3]):
+                        file_name = f.get("n", "")
+                        file_size = get_file_size(f)
+                        logger.debug(
+                            f"[organize_task-2f] list_directory 原始文件{i + 1}: {file_name} (大小: {file_size}, m={f.get('m')})"
+                        )
 
                 files = raw_files
 
@@ -114,90 +137,76 @@ class FileOrganizer:
                     logger.debug(
                         f"[organize_task-2a] 任务目录为空，尝试在父目录查找: {task_name}"
                     )
-                    parent_response = await self._client.list_directory(
-                        download_path_id
-                    )
+                    # 先查缓存，命中则省去一次父目录 RPC；新离线任务会在父目录
+                    # 下新建子目录，所以名称未命中不能直接放弃——重新拉取父目录
+                    # 并刷新缓存条目后再查一次，只有命中路径是免 RPC 的
+                    child_dirs = self._parent_dir_cache.get(download_path_id)
+                    cached_cid = child_dirs.get(task_name) if child_dirs else None
+                    if cached_cid is None:
+                        parent_response = await self._client.list_directory(
+                            download_path_id
+                        )
+                        if parent_response.get("state"):
+                            # 一次遍历建全量 名称->cid 映射并缓存，后续任务直接查表
+                            child_dirs = {
+                                item.get("n"): str(item.get("cid"))
+                                for item in parent_response.get("data", [])
+                                if "fid" not in item  # 目录没有 fid 字段
+                            }
+                            self._parent_dir_cache[download_path_id] = child_dirs
+                            cached_cid = child_dirs.get(task_name)
+                    if cached_cid:
+                        task_path_id = cached_cid
+                        logger.debug(
+                            f"[organize_task-2b] 找到任务目录 ID: {task_path_id}"
+                        )
 
-                    if parent_response.get("state"):
-                        for item in parent_response.get("data", []):
-                            # 查找任务名称对应的目录
-                            is_dir = "fid" not in item  # 目录没有 fid 字段
-                            if item.get("n") == task_name and is_dir:
-                                task_path_id = str(item.get("cid"))
-                                logger.debug(
-                                    f"[organize_task-2b] 找到任务目录 ID: {task_path_id}"
-                                )
-
-                                # 重新查询任务目录内容
-                                dir_response = await self._client.list_directory(
-                                    task_path_id
-                                )
-                                if dir_response.get("state"):
-                                    files = dir_response.get("data", [])
-                                break
+                        # 重新查询任务目录内容
+                        dir_response = await self._client.list_directory(task_path_id)
+                        if dir_response.get("state"):
+                            files = dir_response.get("data", [])
 
                 if not files:
                     logger.warning(f"任务 {task_id} 无文件可整理")
                     return result
 
-                logger.debug(f"[organize_task-3] 构建 filter_config")
-                filter_config = {
-                    "video_formats": media_config.get("video_formats", []),
-                    "min_transfer_size": library_config.get(
-                        "min_transfer_size", media_config.get("min_transfer_size", 0)
-                    ),
-                }
+                # 入口一次遍历预计算各阶段反复探测的字段，
+                # 后续过滤/调试/记录构建都只读 _name/_size/_is_dir 单键
+                for f in files:
+                    f["_name"] = f.get("n", "")
+                    f["_size"] = get_file_size(f)
+                    f["_is_dir"] = "fid" not in f
 
                 # 添加文件列表的详细日志
                 logger.debug(f"[organize_task-3a] 查询到的文件数量: {len(files)}")
-                for i, file in enumerate(files[:5]):  # 只打印前5个文件
-                    file_name = file.get("n", "")
-                    file_size = file.get("s", 0)
-                    is_dir = "fid" not in file
-                    logger.debug(
-                        f"[organize_task-3b] 文件{i + 1}: {file_name} (大小: {file_size}, 目录: {is_dir})"
-                    )
-
-                # 添加文件过滤详情日志
-                logger.debug(f"[organize_task-3c] 开始过滤文件")
-                filtered_files = []
-                skipped_files = []
-                for f in files:
-                    file_name = f.get("n", "")
-                    file_size = f.get("s", 0)
-                    is_directory = "fid" not in f
-
-                    if is_directory:
-                        skipped_files.append(f"{file_name} (目录)")
-                        continue
-
-                    if is_video_file(
-                        file_name, filter_config["video_formats"]
-                    ) and meets_size_requirement(
-                        file_size, filter_config["min_transfer_size"]
-                    ):
-                        filtered_files.append(file_name)
-                    else:
-                        reason = (
-                            "格式不匹配"
-                            if not is_video_file(
-                                file_name, filter_config["video_formats"]
-                            )
-                            else "大小不满足"
+                if _debug_enabled():
+                    for i, file in enumerate(files[:5]):  # 只打印前5个文件
+                        logger.debug(
+                            f"[organize_task-3b] 文件{i + 1}: {file['_name']} (大小: {file['_size']}, 目录: {file['_is_dir']})"
                         )
-                        skipped_files.append(f"{file_name} ({reason})")
-
-                logger.debug(f"[organize_task-3c1] 过滤后保留的文件: {filtered_files}")
-                logger.debug(f"[organize_task-3c2] 过滤后跳过的文件: {skipped_files}")
 
-                video_files = filter_files(files, filter_config)
+                # 跳过列表只为调试输出服务，INFO 级别不构建，免去死列表的逐文件 append
+                logger.debug(f"[organize_task-3c] 开始过滤文件")
+                if _debug_enabled():
+                    video_files, skipped_files = filter_files(
+                        files, filter_config, return_skipped=True
+                    )
+                    logger.debug(
+                        f"[organize_task-3c1] 过滤后保留的文件: {[f.get('n', '') for f in video_files]}"
+                    )
+                    logger.debug(
+                        f"[organize_task-3c2] 过滤后跳过的文件: {skipped_files}"
+                    )
+                else:
+                    video_files = filter_files(files, filter_config)
                 logger.debug(
                     f"[organize_task-3c] 过滤后的视频文件数量: {len(video_files)}"
                 )
-                for i, vf in enumerate(video_files):
-                    logger.debug(
-                        f"[organize_task-3c{3 + i}] 视频文件{i + 1}: {vf.get('n', '')} (m={vf.get('m')}, size={vf.get('s', 0)})"
-                    )
+                if _debug_enabled():
+                    for i, vf in enumerate(video_files):
+                        logger.debug(
+                            f"[organize_task-3c{3 + i}] 视频文件{i + 1}: {vf['_name']} (m={vf.get('m')}, size={vf['_size']})"
+                        )
 
                 if not video_files:
                     logger.warning(
@@ -205,14 +214,11 @@ class FileOrganizer:
                     )
                     return result
 
-                logger.debug(f"[organize_task-4] 获取 library_type")
-                library_type = library_config.get("type", "system")
-
                 if library_type == "system":
                     logger.debug(f"[organize_task-5] 调用 organize_files_system")
                     organize_result = await self.organize_files_system(
                         video_files,
-                        library_config["target_path"],
+                        target_path,
                         task_id,
                         library_config,
                     )
@@ -221,7 +227,7 @@ class FileOrganizer:
                     logger.debug(f"[organize_task-6] 调用 organize_files_xx")
                     organize_result = await self.organize_files_xx(
                         video_files,
-                        library_config["target_path"],
+                        target_path,
                         producer,
                         xx_config or {},
                         task_id,
@@ -252,50 +258,9 @@ class FileOrganizer:
             logger.error(f"[organize_task-Error] {e}")
             logger.error(f"[organize_task-Error] 堆栈跟踪:\n{traceback.format_exc()}")
             raise
-
-            files = dir_response.get("data", [])
-            if not files:
-                logger.warning(f"任务 {task_id} 无文件可整理")
-                return result
-
-            filter_config = {
-                "video_formats": media_config.get("video_formats", []),
-                "min_transfer_size": library_config.get(
-                    "min_transfer_size", media_config.get("min_transfer_size", 0)
-                ),
-            }
-            video_files = filter_files(files, filter_config)
-
-            if not video_files:
-                logger.warning(f"任务 {task_id} 无符合条件的视频文件")
-                return result
-
-            library_type = library_config.get("type", "system")
-
-            if library_type == "system":
-                organize_result = await self.organize_files_system(
-                    video_files, library_config["target_path"], task_id, library_config
-                )
-            elif library_type.startswith("xx-"):
-                producer = extract_producer(library_type)
-                organize_result = await self.organize_files_xx(
-                    video_files,
-                    library_config["target_path"],
-                    producer,
-                    xx_config or {},
-                    task_id,
-                    library_config,
-                )
-            else:
-                logger.warning(f"未知的媒体库类型: {library_type}")
-                return result
-
-            result["success_count"] = organize_result["success_count"]
-            result["failed_count"] = organize_result["failed_count"]
-            result["skipped_count"] = organize_result["skipped_count"]
-            result["errors"] = organize_result["errors"]
-
-            return result
+        finally:
+            # 出错时也落库已完成的部分记录
+            await self.flush_records()
 
     async def organize_files_system(
         self,
@@ -329,67 +294,61 @@ class FileOrganizer:
             result["failed_count"] = len(files)
             return result
 
-        for file in files:
-            file_id = file.get("fid", 0)
-            file_name = file.get("n", "")
-            file_size = file.get("sz", 0) or file.get("s", 0)
+        # 各文件的移动互相独立，受限并发发起减少总等待时间
+        sem = asyncio.Semaphore(library_config.get("concurrency", 8))
 
-            logger.debug(f"准备移动文件: file_id={file_id}, file_name={file_name}")
-            try:
+        # worker 内不做 try/except：异常由 return_exceptions 捕获，统一在汇总处分类
+        async def _process(file: dict) -> tuple:
+            async with sem:
+                file_id = file.get("fid", 0)
+                file_name = file.get("n", "")
+
+                logger.debug(f"准备移动文件: file_id={file_id}, file_name={file_name}")
                 move_response = await self._client.move_file(file_id, target_id)
 
                 if move_response.get("state"):
-                    result["success_count"] += 1
                     logger.info(f"文件 {file_name} 移动成功")
+                    return "success", None
 
-                    await self.save_organize_record(
-                        {
-                            "task_id": task_id,
-                            "source_path": f"/{file_id}",
-                            "target_path": f"{target_dir}/{file_name}",
-                            "file_name": file_name,
-                            "file_size": file_size,
-                            "library_name": library_config.get("name", ""),
-                            "status": "success",
-                            "error_message": None,
-                        }
-                    )
-                else:
-                    result["skipped_count"] += 1
-                    logger.warning(
-                        f"文件 {file_name} 跳过: {move_response.get('error', '已存在')}"
-                    )
+                logger.warning(
+                    f"文件 {file_name} 跳过: {move_response.get('error', '已存在')}"
+                )
+                return "skipped", move_response.get("error", "文件已存在")
 
-                    await self.save_organize_record(
-                        {
-                            "task_id": task_id,
-                            "source_path": f"/{file_id}",
-                            "target_path": f"{target_dir}/{file_name}",
-                            "file_name": file_name,
-                            "file_size": file_size,
-                            "library_name": library_config.get("name", ""),
-                            "status": "skipped",
-                            "error_message": move_response.get("error", "文件已存在"),
-                        }
-                    )
+        outcomes = await asyncio.gather(
+            *(_process(file) for file in files), return_exceptions=True
+        )
 
-            except Exception as e:
-                result["failed_count"] += 1
-                result["errors"].append(str(e))
-                logger.error(f"文件 {file_name} 整理失败: {e}")
+        # 单次遍历完成错误分类与整理记录构建，整任务只有这一个异常处理点
+        lib_name = library_config.get("name", "")
+        for file, outcome in zip(files, outcomes):
+            file_name = file.get("_name") or file.get("n", "")
+            if isinstance(outcome, BaseException):
+                logger.error(f"文件 {file_name} 整理失败: {outcome}")
+                status, error_message = "failed", str(outcome)
+            else:
+                status, error_message = outcome
+
+            await self.save_organize_record(
+                {
+                    "task_id": task_id,
+                    "source_path": f"/{file.get('fid', 0)}",
+                    "target_path": f"{target_dir}/{file_name}",
+                    "file_name": file_name,
+                    "file_size": file.get("_size") or get_file_size(file),
+                    "library_name": lib_name,
+                    "status": status,
+                    "error_message": error_message,
+                }
+            )
 
-                await self.save_organize_record(
-                    {
-                        "task_id": task_id,
-                        "source_path": f"/{file_id}",
-                        "target_path": f"{target_dir}/{file_name}",
-                        "file_name": file_name,
-                        "file_size": file_size,
-                        "library_name": library_config.get("name", ""),
-                        "status": "failed",
-                        "error_message": str(e),
-                    }
-                )
+            if status == "success":
+                result["success_count"] += 1
+            elif status == "skipped":
+                result["skipped_count"] += 1
+            else:
+                result["failed_count"] += 1
+                result["errors"].append(error_message)
 
         return result
 
@@ -426,99 +385,142 @@ class FileOrganizer:
         file_count = len(files)
         keywords = xx_config.get("remove_keywords", [])
 
-        for file in files:
-            file_id = file.get("fid", 0)
-            original_name = file.get("n", "")
-            file_size = file.get("sz", 0) or file.get("s", 0)
+        # 重命名/移动是独立的网络调用，受限并发发起减少总等待时间
+        sem = asyncio.Semaphore(library_config.get("concurrency", 8))
 
-            logger.debug(f"准备移动文件: file_id={file_id}, file_name={original_name}")
-            try:
+        # 同一任务的多个文件常落在同一目标目录（同番号分集），
+        # 以 future 记忆化 get_path_id，并发的重复查询只发一次 API
+        path_id_futures: dict[str, asyncio.Future] = {}
+
+        def _get_target_id(path: str) -> asyncio.Future:
+            future = path_id_futures.get(path)
+            if future is None:
+                future = asyncio.ensure_future(self._client.get_path_id(path))
+                path_id_futures[path] = future
+            return future
+
+        # worker 内不做 try/except：异常由 return_exceptions 捕获，统一在汇总处分类
+        async def _process(file: dict) -> tuple:
+            async with sem:
+                file_id = file.get("fid", 0)
+                original_name = file.get("n", "")
+
+                logger.debug(
+                    f"准备移动文件: file_id={file_id}, file_name={original_name}"
+                )
                 processed_name = remove_keywords(original_name, keywords)
                 processed_name = normalize_filename(processed_name)
 
                 fanhao = extract_fanhao(processed_name)
                 if not fanhao:
-                    result["skipped_count"] += 1
                     logger.warning(f"无法从 {original_name} 提取番号，跳过")
-                    continue
+                    return "skipped", None
 
                 processed_name = normalize_cd_suffix(processed_name, file_count)
                 final_target_path = generate_target_path(
                     processed_name, target_dir, producer
                 )
-                target_dir_path = "/".join(final_target_path.rsplit("/", 1)[:-1])
-                target_id = await self._client.get_path_id(target_dir_path)
+                # rpartition 直接取目录前缀，免去 rsplit 的列表、切片和 re-join
+                target_dir_path = final_target_path.rpartition("/")[0]
+                target_id = await _get_target_id(target_dir_path)
 
                 if not target_id:
-                    result["failed_count"] += 1
-                    result["errors"].append(f"无法创建目标目录: {target_dir_path}")
-                    continue
+                    return "failed", f"无法创建目标目录: {target_dir_path}"
 
-                rename_response = await self._client.rename_file(
-                    file_id, processed_name
-                )
-                if not rename_response.get("state"):
-                    error_msg = rename_response.get("error", "未知错误")
-                    errno = rename_response.get("errno", "N/A")
-                    logger.warning(
-                        f"重命名失败 (errno={errno}): {error_msg}，使用原文件名: {original_name}"
+                # 处理后同名的文件跳过重命名 RPC（服务端同名重命名本就是空操作）
+                if processed_name != original_name:
+                    rename_response = await self._client.rename_file(
+                        file_id, processed_name
                     )
+                    if not rename_response.get("state"):
+                        error_msg = rename_response.get("error", "未知错误")
+                        errno = rename_response.get("errno", "N/A")
+                        logger.warning(
+                            f"重命名失败 (errno={errno}): {error_msg}，使用原文件名: {original_name}"
+                        )
 
                 move_response = await self._client.move_file(file_id, target_id)
 
                 if move_response.get("state"):
-                    result["success_count"] += 1
                     logger.info(f"文件 {original_name} -> {processed_name} 整理成功")
+                    return "success", (processed_name, final_target_path)
 
-                    await self.save_organize_record(
-                        {
-                            "task_id": task_id,
-                            "source_path": f"/{file_id}/{original_name}",
-                            "target_path": final_target_path,
-                            "file_name": processed_name,
-                            "file_size": file_size,
-                            "library_name": library_config.get("name", ""),
-                            "status": "success",
-                            "error_message": None,
-                        }
-                    )
-                else:
-                    result["skipped_count"] += 1
-                    logger.warning(
-                        f"文件 {processed_name} 跳过: {move_response.get('error', '已存在')}"
-                    )
+                logger.warning(
+                    f"文件 {processed_name} 跳过: {move_response.get('error', '已存在')}"
+                )
+                return "skipped", None
 
-            except Exception as e:
+        outcomes = await asyncio.gather(
+            *(_process(file) for file in files), return_exceptions=True
+        )
+
+        # 单次遍历完成错误分类与整理记录构建，整任务只有这一个异常处理点
+        lib_name = library_config.get("name", "")
+        for file, outcome in zip(files, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"文件 {file.get('n', '')} 整理失败: {outcome}")
                 result["failed_count"] += 1
-                result["errors"].append(str(e))
-                logger.error(f"文件 {original_name} 整理失败: {e}")
+                result["errors"].append(str(outcome))
+                continue
+
+            status, payload = outcome
+            if status == "success":
+                processed_name, final_target_path = payload
+                await self.save_organize_record(
+                    {
+                        "task_id": task_id,
+                        "source_path": f"/{file.get('fid', 0)}/{file.get('n', '')}",
+                        "target_path": final_target_path,
+                        "file_name": processed_name,
+                        "file_size": file.get("_size") or get_file_size(file),
+                        "library_name": lib_name,
+                        "status": "success",
+                        "error_message": None,
+                    }
+                )
+                result["success_count"] += 1
+            elif status == "skipped":
+                result["skipped_count"] += 1
+            else:
+                result["failed_count"] += 1
+                result["errors"].append(payload)
 
         return result
 
     async def save_organize_record(self, record: dict) -> None:
         """
-        保存整理记录到数据库
+        缓冲整理记录（任务结束时由 flush_records 批量落库）
 
         Args:
             record: 整理记录字典
         """
+        self._pending_records.append(record)
+
+    async def flush_records(self) -> None:
+        """将缓冲的整理记录以单个事务批量写入数据库"""
+        if not self._pending_records:
+            return
+
+        records, self._pending_records = self._pending_records, []
         try:
             async with get_session() as session:
-                organize_record = OrganizeRecord(
-                    task_id=record["task_id"],
-                    source_path=record["source_path"],
-                    target_path=record["target_path"],
-                    file_name=record["file_name"],
-                    file_size=record["file_size"],
-                    library_name=record["library_name"],
-                    status=record["status"],
-                    error_message=record.get("error_message"),
+                session.add_all(
+                    OrganizeRecord(
+                        task_id=record["task_id"],
+                        source_path=record["source_path"],
+                        target_path=record["target_path"],
+                        file_name=record["file_name"],
+                        file_size=record["file_size"],
+                        library_name=record["library_name"],
+                        status=record["status"],
+                        error_message=record.get("error_message"),
+                    )
+                    for record in records
                 )
-                session.add(organize_record)
                 await session.commit()
-                logger.debug(f"整理记录已保存: {record['file_name']}")
+                logger.debug(f"批量保存 {len(records)} 条整理记录")
         except Exception as e:
-            logger.error(f"保存整理记录失败: {e}")
+            logger.error(f"批量保存整理记录失败: {e}")
 
     async def cleanup_source(
         self, task_id: str, info_hash: str, source_files: list[dict]
@@ -4,14 +4,21 @@
 """
 
 import asyncio
-import random
+import functools
 import re
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional
 
 from loguru import logger
 from p115client import P115Client as P115SyncClient
 
+from app.utils.helpers import TokenBucket, async_cached
+
+# 临时目录（番号目录）模式，模块级预编译避免每次判断走 re 缓存查找
+_TEMP_DIR_RE = re.compile(r"^[A-Z]+-\d+$")
+
 
 class P115Client:
     """p115 客户端单例封装"""
@@ -21,9 +28,24 @@ class P115Client:
     _client: Optional[P115SyncClient] = None
     _cookies: Optional[str] = None
 
+    # 进程内 path_id LRU 缓存参数（SQLite 缓存之上的第一层）
+    _MEM_CACHE_MAX = 1024
+    _MEM_CACHE_TTL = 60.0
+
     def __init__(self, cookies: str):
         self._cookies = cookies
         self._client = P115SyncClient(cookies, check_for_relogin=False)
+        # 令牌桶限流：允许 4 次突发，之后按 2 req/s 放行，
+        # 替代每次调用前无条件随机睡 0.5-1 秒
+        self._bucket = TokenBucket(rate=2.0, capacity=4)
+        # 专用线程池：隔离默认池，且绕过 to_thread 每次的 contextvars 拷贝
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="p115")
+        # (响应对象, info_hash -> task 索引)，同一份缓存响应只建一次索引
+        self._offline_index: Optional[tuple[dict, dict]] = None
+        # (library_name, path) -> (path_id, 过期时间)，热路径解析免 DB round-trip
+        self._mem_cache: OrderedDict[tuple[str, str], tuple[int, float]] = (
+            OrderedDict()
+        )
 
     @classmethod
     async def get_client(cls, cookies: str) -> "P115Client":
@@ -35,14 +57,24 @@ class P115Client:
                     logger.info("p115 客户端实例已创建")
         return cls._instance
 
+    async def close(self) -> None:
+        """关闭专用线程池（应用 lifespan 收尾时调用）"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
     async def _retry_with_backoff(
         self, func, *args, max_retries: int = 3, **kwargs
     ) -> Any:
         """执行 API 调用并在失败时自动重试（指数退避）"""
+        loop = asyncio.get_running_loop()
+        if kwargs:
+            func = functools.partial(func, **kwargs)
+
         for attempt in range(max_retries):
             try:
-                await self._rate_limit()
-                result = await asyncio.to_thread(func, *args, **kwargs)
+                # 令牌桶有余量时立即返回，不再有首次调用前的强制睡眠；
+                # 仅在重试分支才有指数退避等待
+                await self._bucket.acquire()
+                result = await loop.run_in_executor(self._executor, func, *args)
                 return result
             except Exception as e:
                 if attempt == max_retries - 1:
@@ -55,34 +87,37 @@ class P115Client:
                 )
                 await asyncio.sleep(backoff_time)
 
-    async def _rate_limit(self) -> None:
-        """API 调用速率限制（随机延迟 0.5-1 秒）"""
-        delay = random.uniform(0.5, 1.0)
-        await asyncio.sleep(delay)
-
     async def add_offline_task(self, magnet: str, path_id: str) -> dict:
         """添加离线下载任务"""
         return await self._retry_with_backoff(
             self._client.offline_add_url, {"url": magnet, "wp_path_id": path_id}
         )
 
+    @async_cached(ttl=2.0)
     async def get_offline_tasks(self) -> dict:
-        """获取离线任务列表"""
+        """获取离线任务列表（短 TTL 缓存，/status 与 /tasks 同时轮询只打一次上游）"""
         return await self._retry_with_backoff(self._client.offline_list)
 
     async def get_task_status(self, info_hash: str) -> Optional[dict]:
-        """获取单个任务状态"""
+        """获取单个任务状态（基于缓存响应的 hash 索引，查找 O(1)）"""
         tasks_response = await self.get_offline_tasks()
 
         if not tasks_response.get("state"):
             return None
 
-        tasks = tasks_response.get("tasks") or []
-        for task in tasks:
-            if task.get("info_hash") == info_hash:
-                return task
+        # 以响应对象身份判断索引是否仍对应当前缓存，TTL 内的重复查询免重建
+        index = self._offline_index
+        if index is None or index[0] is not tasks_response:
+            index = (
+                tasks_response,
+                {
+                    task.get("info_hash"): task
+                    for task in tasks_response.get("tasks") or []
+                },
+            )
+            self._offline_index = index
 
-        return None
+        return index[1].get(info_hash)
 
     async def delete_offline_task(self, info_hash: str) -> dict:
         """删除离线任务"""
@@ -161,20 +196,34 @@ class P115Client:
                             self._client.fs_makedirs_app, full_path_to_create
                         )
                         if create_result.get("state"):
-                            # 创建后重新获取 ID
-                            result = await self._retry_with_backoff(
-                                self._client.fs_files,
-                                {"cid": current_id, "limit": 1000},
+                            # 创建接口本身会返回新目录 ID，优先直接消费，
+                            # 省去创建后重新列目录+扫描的一次 round-trip
+                            new_cid = (
+                                create_result.get("cid")
+                                or create_result.get("file_id")
+                                or create_result.get("category_id")
                             )
-                            for item in result.get("data", []):
-                                is_dir = "fid" not in item
-                                if item.get("n") == part and is_dir:
-                                    current_id = str(item.get("cid"))
-                                    logger.debug(
-                                        f"创建后找到目录: {part}, cid={current_id}"
-                                    )
-                                    found = True
-                                    break
+                            if new_cid:
+                                current_id = str(new_cid)
+                                logger.debug(
+                                    f"创建目录成功: {part}, cid={current_id}"
+                                )
+                                found = True
+                            else:
+                                # 响应未带 ID 时退回重新列目录查找
+                                result = await self._retry_with_backoff(
+                                    self._client.fs_files,
+                                    {"cid": current_id, "limit": 1000},
+                                )
+                                for item in result.get("data", []):
+                                    is_dir = "fid" not in item
+                                    if item.get("n") == part and is_dir:
+                                        current_id = str(item.get("cid"))
+                                        logger.debug(
+                                            f"创建后找到目录: {part}, cid={current_id}"
+                                        )
+                                        found = True
+                                        break
 
                     if not found:
                         logger.error(f"目录不存在且创建失败: {normalized_path}")
@@ -228,6 +277,29 @@ class P115Client:
             logger.error(f"验证 cookies 失败: {e}")
             return False
 
+    def _mem_cache_get(self, library_name: str, path: str) -> Optional[int]:
+        """进程内缓存读取（过期即删，命中移到队尾保持 LRU 顺序）"""
+        key = (library_name, path)
+        entry = self._mem_cache.get(key)
+        if entry is None:
+            return None
+
+        path_id, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._mem_cache[key]
+            return None
+
+        self._mem_cache.move_to_end(key)
+        return path_id
+
+    def _mem_cache_put(self, library_name: str, path: str, path_id: int) -> None:
+        """进程内缓存写入（超容量时淘汰最久未用项）"""
+        key = (library_name, path)
+        self._mem_cache[key] = (path_id, time.monotonic() + self._MEM_CACHE_TTL)
+        self._mem_cache.move_to_end(key)
+        if len(self._mem_cache) > self._MEM_CACHE_MAX:
+            self._mem_cache.popitem(last=False)
+
     async def _find_nearest_cached_ancestor(
         self, library_name: str, path: str
     ) -> tuple[str | None, str]:
@@ -242,18 +314,55 @@ class P115Client:
             tuple: (缓存的路径ID, 需要继续遍历的相对路径)
             例如: 如果 /云下载/测试/目标 被缓存，返回 (cid, "其他/MUDR-359")
         """
+        from app.core.database import get_session
+        from app.models.path_id_cache import PathIdCache
+        from sqlalchemy import select
+
         parts = path.strip("/").split("/")
+        # 滚动前缀一次遍历生成全部祖先（由浅到深再反转为深度降序），
+        # 避免逐级 join 的 O(N²) 字符串拼接
+        ancestors = []
+        prefix = ""
+        for part in parts:
+            prefix = f"{prefix}/{part}"
+            ancestors.append(prefix)
+        ancestors.reverse()
+        now = int(time.time())
 
-        # 从完整路径开始，逐级向上查找缓存
-        for i in range(len(parts), 0, -1):
-            ancestor_path = "/" + "/".join(parts[:i])
-            cached_id = await self._get_cached_path_id(library_name, ancestor_path)
-            if cached_id is not None:
+        # 内存层按深度降序逐级探测（等价于前缀树下行），最深命中直接返回
+        for i, ancestor_path in zip(range(len(parts), 0, -1), ancestors):
+            mem_hit = self._mem_cache_get(library_name, ancestor_path)
+            if mem_hit is not None:
                 remaining_path = "/".join(parts[i:]) if i < len(parts) else ""
                 logger.debug(
-                    f"找到缓存祖先: {ancestor_path} -> {cached_id}, 剩余路径: {remaining_path or '(空)'}"
+                    f"内存缓存命中: {ancestor_path} -> {mem_hit}, 剩余路径: {remaining_path or '(空)'}"
+                )
+                return str(mem_hit), remaining_path
+
+        async with get_session() as session:
+            result = await session.execute(
+                select(PathIdCache.path, PathIdCache.path_id).where(
+                    PathIdCache.library_name == library_name,
+                    PathIdCache.path.in_(ancestors),
+                    PathIdCache.expires_at > now,  # 读时过滤过期
                 )
-                return str(cached_id), remaining_path
+            )
+            cached = dict(result.all())
+
+        # DB 命中回填内存层，后续同路径解析走 O(1) 内存读
+        for ancestor_path, path_id in cached.items():
+            self._mem_cache_put(library_name, ancestor_path, path_id)
+
+        if cached:
+            # ancestors 本身按深度降序，第一个命中即最长匹配
+            for i, ancestor_path in zip(range(len(parts), 0, -1), ancestors):
+                cached_id = cached.get(ancestor_path)
+                if cached_id is not None:
+                    remaining_path = "/".join(parts[i:]) if i < len(parts) else ""
+                    logger.debug(
+                        f"找到缓存祖先: {ancestor_path} -> {cached_id}, 剩余路径: {remaining_path or '(空)'}"
+                    )
+                    return str(cached_id), remaining_path
 
         # 没有找到任何缓存，从根目录开始
         logger.debug(f"未找到任何缓存祖先，从根目录开始遍历")
@@ -273,10 +382,10 @@ class P115Client:
         Returns:
             bool: True 表示是临时目录，False 表示是稳定目录
         """
-        last_part = path.rsplit("/", 1)[-1]
+        last_part = path.rpartition("/")[2]
         # 番号模式：大写字母 + 横杠 + 数字
         # 例如: MUDR-359, ABP-123, SSIS-001, IPX-12345
-        is_temp = bool(re.match(r"^[A-Z]+-\d+$", last_part))
+        is_temp = bool(_TEMP_DIR_RE.match(last_part))
 
         if is_temp:
             logger.debug(f"检测到临时目录: {last_part}")
@@ -292,12 +401,19 @@ class P115Client:
         return "/" + "/".join(parts)
 
     async def _get_cached_path_id(self, library_name: str, path: str) -> Optional[int]:
-        """从缓存读取 path_id（读时过滤过期）"""
+        """从缓存读取 path_id（读时过滤过期；path 需已规范化）"""
         from app.core.database import get_session
         from app.models.path_id_cache import PathIdCache
         from sqlalchemy import select
 
-        normalized_path = self._normalize_path(path)
+        # 调用链入口（get_path_id）已规范化，这里不再重复 strip/split/join
+        normalized_path = path
+
+        # 先查进程内缓存，命中免去会话与 DB round-trip
+        mem_hit = self._mem_cache_get(library_name, normalized_path)
+        if mem_hit is not None:
+            return mem_hit
+
         now = int(time.time())
 
         async with get_session() as session:
@@ -309,7 +425,10 @@ class P115Client:
                 )
             )
             row = result.scalar_one_or_none()
-            return row if row is not None else None
+
+        if row is not None:
+            self._mem_cache_put(library_name, normalized_path, row)
+        return row if row is not None else None
 
     async def _set_cached_path_id(
         self,
@@ -318,11 +437,12 @@ class P115Client:
         path_id: int,
         ttl_seconds: int = 600,
     ) -> None:
-        """写入缓存（UPSERT，并发安全）"""
+        """写入缓存（UPSERT，并发安全；path 需已规范化）"""
         from app.core.database import get_session
         from sqlalchemy import text
 
-        normalized_path = self._normalize_path(path)
+        # 调用链入口（get_path_id）已规范化，这里不再重复 strip/split/join
+        normalized_path = path
         now = int(time.time())
         expires_at = now + ttl_seconds
 
@@ -348,6 +468,28 @@ class P115Client:
             )
             await session.commit()
 
+        # 写穿进程内缓存（临时目录在调用方已被过滤，不会走到这里）
+        self._mem_cache_put(library_name, normalized_path, path_id)
+
+    async def cache_gc_loop(
+        self, interval: float = 300.0, batch_size: int = 1000
+    ) -> None:
+        """
+        周期清理过期的 path_id 缓存行（后台任务，lifespan 启动）
+
+        每轮分批删除直到当批不足 batch_size，保持表和索引精简；
+        清理失败只记录日志，不中断循环。
+        """
+        while True:
+            try:
+                while await self._cleanup_expired_cache(batch_size) >= batch_size:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"清理过期 path_id 缓存失败: {e}")
+            await asyncio.sleep(interval)
+
     async def _cleanup_expired_cache(self, batch_size: int = 1000) -> int:
         """清理过期缓存（批量删除，返回删除数量）"""
         from app.core.database import get_session
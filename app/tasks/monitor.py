@@ -6,6 +6,8 @@
 import asyncio
 import random
 import signal
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Optional
 
@@ -19,13 +21,32 @@ from app.models.offline_task import OfflineTask
 class TaskMonitor:
     """后台监控任务管理器"""
 
+    # 已处理 hash 的保留上限与过期时间，防止长期运行时无限增长
+    _PROCESSED_MAX = 10_000
+    _PROCESSED_TTL = 86400.0
+
+    # 最近一次任务提交时间（类级，由任务提交端点通过 notify_task_added 更新）
+    _last_submission: float = 0.0
+    # 提交到批量落库之间的宽限期，短路判断需避开这段可见性延迟
+    _SUBMISSION_GRACE = 5.0
+
     def __init__(self, p115_client, file_organizer, config):
         self._client = p115_client
         self._organizer = file_organizer
         self._config = config
         self._task: Optional[asyncio.Task] = None
         self._stop_event = asyncio.Event()
-        self._processed_hashes: set[str] = set()
+        # hash -> 记录时间的有界 LRU，替代只增不减的 set
+        self._processed_hashes: OrderedDict[str, float] = OrderedDict()
+        # 最近一次确认 DB 无监控任务的时间（0 表示尚未确认过）
+        self._last_empty_check = 0.0
+        # 媒体库配置启动后不变，预建 name -> library 索引
+        self._libraries_by_name = {lib.name: lib for lib in config.media.libraries}
+
+    @classmethod
+    def notify_task_added(cls) -> None:
+        """任务提交端点调用：结束监控循环的空闲短路"""
+        cls._last_submission = time.monotonic()
 
     async def start_monitor(self) -> None:
         """启动监控任务"""
@@ -59,6 +80,24 @@ class TaskMonitor:
     async def check_tasks(self) -> None:
         """检查所有离线任务状态 - 只处理系统添加的任务"""
         try:
+            # 淘汰超过 TTL 的已处理记录（最旧项在队首，碰到未过期即停）
+            cutoff = time.monotonic() - self._PROCESSED_TTL
+            while self._processed_hashes:
+                oldest_hash, ts = next(iter(self._processed_hashes.items()))
+                if ts >= cutoff:
+                    break
+                del self._processed_hashes[oldest_hash]
+
+            # 空闲短路：上轮已确认 DB 无监控任务、且其后没有新提交时，
+            # 本轮连 SELECT 都不发，空闲监控开销趋近于零
+            if (
+                self._last_empty_check
+                and self._last_empty_check
+                > TaskMonitor._last_submission + self._SUBMISSION_GRACE
+            ):
+                logger.debug("没有需要监控的系统任务（空闲短路）")
+                return
+
             # 1. 查询数据库获取系统任务的 info_hash 列表
             async with get_session() as session:
                 result = await session.execute(
@@ -69,26 +108,64 @@ class TaskMonitor:
                 system_hashes = set(row[0] for row in result.fetchall())
 
             if not system_hashes:
+                self._last_empty_check = time.monotonic()
                 logger.debug("没有需要监控的系统任务")
                 return
 
+            self._last_empty_check = 0.0
+
             # 2. 获取 115 离线任务列表
             response = await self._client.get_offline_tasks()
             if not response.get("state"):
                 logger.error("获取离线任务列表失败")
                 return
 
-            # 3. 只处理系统添加的任务
+            # 3. 只处理系统添加的任务：先建 hash 索引再取交集，避免逐条线性比对
             tasks = response.get("tasks") or []
-            for task in tasks:
-                info_hash = task.get("info_hash")
-                if info_hash and info_hash in system_hashes:
-                    await self._process_task(task)
+            by_hash = {
+                task.get("info_hash"): task for task in tasks if task.get("info_hash")
+            }
+            matching = [by_hash[h] for h in system_hashes & by_hash.keys()]
+            if not matching:
+                return
+
+            # 同一轮完成多个任务时，一次 IN 查询预取全部 library_name，
+            # 免去每个任务单独一次 SELECT
+            completed_hashes = [
+                task["info_hash"] for task in matching if task.get("status") == 2
+            ]
+            library_names: dict[str, str] = {}
+            if completed_hashes:
+                async with get_session() as session:
+                    result = await session.execute(
+                        select(OfflineTask.info_hash, OfflineTask.library_name).where(
+                            OfflineTask.info_hash.in_(completed_hashes)
+                        )
+                    )
+                    library_names = dict(result.all())
+
+            # 受限并发处理，单个慢任务不再拖住同一轮内的其他任务
+            sem = asyncio.Semaphore(4)
+
+            async def _run(task: dict) -> None:
+                async with sem:
+                    await self._process_task(task, library_names)
+
+            results = await asyncio.gather(
+                *(_run(task) for task in matching), return_exceptions=True
+            )
+            for task, outcome in zip(matching, results):
+                if isinstance(outcome, Exception):
+                    logger.error(
+                        f"处理任务 [{task.get('name', '未知任务')}] 失败: {outcome}"
+                    )
 
         except Exception as e:
             logger.error(f"检查任务时发生错误: {e}")
 
-    async def _process_task(self, task: dict) -> None:
+    async def _process_task(
+        self, task: dict, library_names: Optional[dict] = None
+    ) -> None:
         """处理单个离线任务"""
         info_hash = task.get("info_hash")
         status = task.get("status")
@@ -99,34 +176,46 @@ class TaskMonitor:
 
         if status == 2:
             logger.info(f"任务 [{name}] 已完成，开始整理文件")
-            await self._handle_completed_task(task)
-            self._processed_hashes.add(info_hash)
+            await self._handle_completed_task(task, library_names)
+            self._mark_processed(info_hash)
 
         elif status < 0:  # 负数表示失败（如 -1）
             logger.warning(f"任务 [{name}] 下载失败 (status={status})")
             await self._handle_failed_task(task)
-            self._processed_hashes.add(info_hash)
-
-    async def _handle_completed_task(self, task: dict) -> None:
+            self._mark_processed(info_hash)
+
+    def _mark_processed(self, info_hash: str) -> None:
+        """记录已处理的任务 hash（超上限时淘汰最旧项）"""
+        self._processed_hashes[info_hash] = time.monotonic()
+        self._processed_hashes.move_to_end(info_hash)
+        if len(self._processed_hashes) > self._PROCESSED_MAX:
+            self._processed_hashes.popitem(last=False)
+
+    async def _handle_completed_task(
+        self, task: dict, library_names: Optional[dict] = None
+    ) -> None:
         """处理已完成的任务 - 触发文件整理"""
         info_hash = task.get("info_hash")
 
-        # 通过数据库查询 library_name
+        # 优先用 check_tasks 批量预取的 library_name，未提供时回退单条查询
         library_config = None
         if info_hash:
-            try:
-                async with get_session() as session:
-                    result = await session.execute(
-                        select(OfflineTask.library_name).where(
-                            OfflineTask.info_hash == info_hash
+            library_name = (library_names or {}).get(info_hash)
+            if library_name is None:
+                try:
+                    async with get_session() as session:
+                        result = await session.execute(
+                            select(OfflineTask.library_name).where(
+                                OfflineTask.info_hash == info_hash
+                            )
                         )
-                    )
-                    library_name = result.scalar_one_or_none()
-                    if library_name:
-                        library_config = self._find_library_by_name(library_name)
-                        logger.debug(f"通过数据库找到 library: {library_name}")
-            except Exception as e:
-                logger.error(f"查询 library_name 失败: {e}")
+                        library_name = result.scalar_one_or_none()
+                except Exception as e:
+                    logger.error(f"查询 library_name 失败: {e}")
+
+            if library_name:
+                library_config = self._find_library_by_name(library_name)
+                logger.debug(f"通过数据库找到 library: {library_name}")
 
         if library_config is None:
             logger.error(
@@ -213,10 +302,7 @@ class TaskMonitor:
 
     def _find_library_by_name(self, name: str):
         """根据名称查找媒体库配置"""
-        for library in self._config.media.libraries:
-            if library.name == name:
-                return library
-        return None
+        return self._libraries_by_name.get(name)
 
     def _get_random_interval(self) -> float:
         """获取随机轮询间隔（秒）"""
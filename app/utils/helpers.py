@@ -4,11 +4,23 @@
 """
 
 from __future__ import annotations
+from functools import lru_cache, wraps
 from typing import Optional
+import asyncio
 import re
 import base64
+import time
 
 
+# 预编译：每次 POST /tasks 都会调用，避免重复编译
+# hex: 40 位 0-9a-fA-F
+# base32: 32 位 A-Z2-7
+_MAGNET_BTIH_RE = re.compile(
+    r"xt=urn:btih:([a-fA-F0-9]{40}|[A-Z2-7]{32})", re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=1024)
 def parse_info_hash_from_magnet(magnet: str) -> Optional[str]:
     """
     从 magnet 链接中解析 info_hash (BTIH)
@@ -36,12 +48,12 @@ def parse_info_hash_from_magnet(magnet: str) -> Optional[str]:
     if not magnet or not isinstance(magnet, str):
         return None
 
+    # 前缀都不存在时直接返回，跳过正则扫描
+    if "urn:btih:" not in magnet.lower():
+        return None
+
     # 提取 xt=urn:btih: 后面的 hash（支持 hex 和 base32）
-    # hex: 40 位 0-9a-fA-F
-    # base32: 32 位 A-Z2-7
-    match = re.search(
-        r"xt=urn:btih:([a-fA-F0-9]{40}|[A-Z2-7]{32})", magnet, re.IGNORECASE
-    )
+    match = _MAGNET_BTIH_RE.search(magnet)
     if not match:
         return None
 
@@ -62,3 +74,87 @@ def parse_info_hash_from_magnet(magnet: str) -> Optional[str]:
             return None
     else:
         return None
+
+
+class TokenBucket:
+    """
+    异步令牌桶限流器（monotonic 懒补充）
+
+    桶内有令牌时 acquire 立即返回，允许突发 capacity 个调用；
+    耗尽后按 rate 的稳定速率放行，只在真正超出预算时才等待。
+
+    Args:
+        rate: 每秒补充的令牌数（稳定速率）
+        capacity: 桶容量（允许的突发量）
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        # 等待者在锁内计算自己的睡眠时长，天然按到达顺序排队
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated_at) * self._rate
+        )
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """取走 tokens 个令牌，不足时等待补充"""
+        async with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return
+
+            # 欠下的令牌换算为等待时间；在锁内睡眠使后来者顺序排队
+            wait = (tokens - self._tokens) / self._rate
+            self._tokens -= tokens
+            self._updated_at = time.monotonic()
+            await asyncio.sleep(wait)
+
+
+def async_cached(ttl: float):
+    """
+    异步函数结果 TTL 缓存装饰器（single-flight）
+
+    相同参数的并发调用共享同一个进行中的 future，只触发一次实际调用；
+    成功结果在 ttl 秒内直接复用，失败结果不缓存（下次调用重新执行）。
+
+    Args:
+        ttl: 缓存有效期（秒）
+
+    Returns:
+        装饰器函数
+    """
+    def decorator(func):
+        cache: dict = {}  # key -> (future, expires_at)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+
+            entry = cache.get(key)
+            if entry is not None:
+                future, expires_at = entry
+                # 进行中的调用直接等待（single-flight）；已完成且未过期的复用结果
+                if not future.done() or (now < expires_at and future.exception() is None):
+                    return await asyncio.shield(future)
+
+            future = asyncio.ensure_future(func(*args, **kwargs))
+            cache[key] = (future, now + ttl)
+            try:
+                return await asyncio.shield(future)
+            except Exception:
+                # 失败不缓存，避免错误结果在 TTL 内被复用
+                cache.pop(key, None)
+                raise
+
+        return wrapper
+
+    return decorator
@@ -3,36 +3,56 @@
 @responsibility 初始化应用、集成路由、启动监控任务、验证 cookies
 """
 
+import asyncio
+import os
+import sys
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from fastapi import FastAPI, Request
+import orjson
+from fastapi import FastAPI, Request, Response
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
 from loguru import logger
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.api import tasks, organize, config, system
-from app.api.tasks import init_tasks_router
+from app.api.orjson_response import ORJSONResponse
+from app.api.tasks import drain_writer, init_tasks_router
 from app.api.config import init_config_router
 from app.api.system import init_system_router
-from app.core.config import load_config
-from app.core.database import init_db, get_session
-from app.schemas.api import ApiResponse, success_response
-from app.services.p115_client import P115Client
-from app.services.file_organizer import FileOrganizer
-from app.tasks.monitor import TaskMonitor
+from app.schemas.api import success_response
+
+# 重量级服务模块（p115client、sqlalchemy 引擎等）延迟到 lifespan 再导入，
+# 模块加载（测试收集、--help）不必预付这部分成本
+if TYPE_CHECKING:
+    from app.services.p115_client import P115Client
+    from app.services.file_organizer import FileOrganizer
+    from app.tasks.monitor import TaskMonitor
+
+# uvloop（libuv 实现的事件循环）对小 JSON 响应的吞吐明显高于默认 selector 循环，
+# 随 uvicorn[standard] 一起安装；在构建 FastAPI 前装载，保证 lifespan 也跑在其上
+if sys.platform != "win32":
+    import uvloop
+
+    uvloop.install()
 
 
 config_obj = None
-p115_client: Optional[P115Client] = None
-task_monitor: Optional[TaskMonitor] = None
-file_organizer: Optional[FileOrganizer] = None
+p115_client: Optional["P115Client"] = None
+task_monitor: Optional["TaskMonitor"] = None
+file_organizer: Optional["FileOrganizer"] = None
+cache_gc_task = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global config_obj, p115_client, task_monitor, file_organizer
+    global config_obj, p115_client, task_monitor, file_organizer, cache_gc_task
+
+    from app.core.config import load_config
+    from app.core.database import init_db
+    from app.services.p115_client import P115Client
+    from app.services.file_organizer import FileOrganizer
+    from app.tasks.monitor import TaskMonitor
 
     logger.info("应用启动中...")
 
@@ -61,20 +81,50 @@ async def lifespan(app: FastAPI):
     await task_monitor.start_monitor()
     logger.info("后台监控任务已启动")
 
+    cache_gc_task = asyncio.create_task(p115_client.cache_gc_loop())
+    logger.info("path_id 缓存清理任务已启动")
+
+    # 启动时同步生成并缓存 OpenAPI schema，首个 /docs 请求不再付生成延迟
+    if app.openapi_url:
+        app.openapi()
+
     yield
 
+    if cache_gc_task:
+        cache_gc_task.cancel()
+        try:
+            await cache_gc_task
+        except asyncio.CancelledError:
+            pass
+        logger.info("path_id 缓存清理任务已停止")
+
     if task_monitor:
         await task_monitor.stop_monitor()
         logger.info("后台监控任务已停止")
 
+    # 冲刷任务记录写入队列，攒批窗口内的记录不能随关闭丢失
+    await drain_writer()
+    logger.info("任务记录写入队列已冲刷")
+
+    if p115_client:
+        await p115_client.close()
+        logger.info("p115 客户端线程池已关闭")
+
     logger.info("应用已关闭")
 
 
+# 内部管理 API 在生产环境（PROD=1）不暴露文档，省去 schema 生成与模型图常驻内存
+_PROD = os.environ.get("PROD") == "1"
+
 app = FastAPI(
     title="115 离线任务管理器",
     description="管理 115 网盘离线下载任务并自动整理文件",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+    openapi_url=None if _PROD else "/openapi.json",
+    docs_url=None if _PROD else "/docs",
+    redoc_url=None if _PROD else "/redoc",
 )
 
 
@@ -83,11 +133,10 @@ app = FastAPI(
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     """处理 HTTP 异常"""
     logger.info(f"HTTP 异常处理器被调用: {exc.status_code} - {exc.detail}")
-    return JSONResponse(
+    # 固定三键结构直接写字典字面量，省去模型构建 + model_dump 的往返
+    return ORJSONResponse(
         status_code=exc.status_code,
-        content=ApiResponse(
-            code=exc.status_code, message=exc.detail, data=None
-        ).model_dump(),
+        content={"code": exc.status_code, "message": exc.detail, "data": None},
     )
 
 
@@ -99,22 +148,31 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         {"loc": list(error["loc"]), "msg": error["msg"], "type": error["type"]}
         for error in exc.errors()
     ]
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
-        content=ApiResponse(
-            code=422, message="请求参数验证失败", data={"errors": errors}
-        ).model_dump(),
+        content={
+            "code": 422,
+            "message": "请求参数验证失败",
+            "data": {"errors": errors},
+        },
     )
 
 
+# 500 响应体固定不变，导入时序列化一次，过载时的错误路径只剩 bytes 发送
+_INTERNAL_ERROR_BYTES = orjson.dumps(
+    {"code": 500, "message": "服务器内部错误", "data": None}
+)
+
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """处理通用异常"""
     logger.info(f"通用异常处理器被调用: {type(exc).__name__}")
     logger.exception(f"服务器内部错误: {str(exc)}")
-    return JSONResponse(
+    return Response(
+        content=_INTERNAL_ERROR_BYTES,
         status_code=500,
-        content=ApiResponse(code=500, message="服务器内部错误", data=None).model_dump(),
+        media_type="application/json",
     )
 
 
@@ -124,14 +182,23 @@ app.include_router(config.router, prefix="/api", tags=["config"])
 app.include_router(system.router, prefix="/api", tags=["system"])
 
 
-@app.get("/")
-async def root():
-    return success_response(
+# 固定不变的响应体在导入时序列化一次，探活热路径只剩一次 bytes 发送
+_ROOT_BYTES = orjson.dumps(
+    success_response(
         data={"message": "115 离线任务管理器 API", "version": "1.0.0"},
         message="服务运行中",
     )
+)
+_HEALTH_BYTES = orjson.dumps(
+    success_response(data={"status": "healthy"}, message="健康检查通过")
+)
+
+
+@app.get("/")
+async def root():
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 
 @app.get("/health")
 async def health_check():
-    return success_response(data={"status": "healthy"}, message="健康检查通过")
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
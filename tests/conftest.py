@@ -0,0 +1,33 @@
+"""
+@description pytest 公共 fixture
+@responsibility 提供 session 级事件循环，支撑跨测试复用的异步 fixture
+"""
+
+import asyncio
+
+import pytest
+
+# 与线上一致优先使用 uvloop，缺失时（如 Windows 开发机）回退默认循环
+try:
+    import uvloop
+
+    _new_event_loop = uvloop.new_event_loop
+except ImportError:
+    _new_event_loop = asyncio.new_event_loop
+
+
+# session 级异步 fixture（如 test_api 的 client）需要同生命周期的事件循环，
+# pytest-asyncio 0.21 默认按函数重建循环，会导致复用的 client 在终结时报循环已关闭
+@pytest.fixture(scope="session")
+def event_loop():
+    loop = _new_event_loop()
+    yield loop
+    loop.close()
+
+
+def pytest_sessionstart(session):
+    """预热重量级导入：aiosqlite 方言与模型元数据在收集前加载一次，
+    首个用到数据库的测试不再付方言注册与模型映射的首次导入成本"""
+    import sqlalchemy.dialects.sqlite.aiosqlite  # noqa: F401
+
+    from app.models import offline_task, organize_record, path_id_cache  # noqa: F401
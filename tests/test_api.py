@@ -4,6 +4,7 @@
 """
 
 import pytest
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest_asyncio
@@ -16,44 +17,50 @@ from app.api.config import init_config_router
 from app.api.system import init_system_router
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_config():
-    cfg = MagicMock()
-    cfg.p115.cookies = "test_cookies"
-    cfg.p115.rotation_training_interval_min = 60
-    cfg.p115.rotation_training_interval_max = 80
-
-    library1 = MagicMock()
-    library1.name = "电影库"
-    library1.download_path = "/云下载/电影"
-    library1.target_path = "/媒体库/电影"
-    library1.type = "system"
-    library1.min_transfer_size = 100
-
-    library2 = MagicMock()
-    library2.name = "成人库"
-    library2.download_path = "/云下载/成人"
-    library2.target_path = "/媒体库/成人"
-    library2.type = "xx-SSNI"
-    library2.min_transfer_size = 200
-
-    cfg.media.libraries = [library1, library2]
-    cfg.media.video_formats = ["mp4", "mkv"]
-    cfg.media.min_transfer_size = 150
-    cfg.media.xx.remove_keywords = ["hhd800.com@"]
-
-    return cfg
-
-
-@pytest.fixture
-def mock_p115_client():
-    client = AsyncMock()
-    client.verify_cookies = AsyncMock(return_value=True)
-    client.add_offline_task = AsyncMock(
-        return_value={"state": True, "info_hash": "abc123hash"}
+    # SimpleNamespace 构建开销远低于 MagicMock，且属性拼错会立刻抛 AttributeError
+    return SimpleNamespace(
+        p115=SimpleNamespace(
+            cookies="test_cookies",
+            rotation_training_interval_min=60,
+            rotation_training_interval_max=80,
+        ),
+        media=SimpleNamespace(
+            libraries=[
+                SimpleNamespace(
+                    name="电影库",
+                    download_path="/云下载/电影",
+                    target_path="/媒体库/电影",
+                    type="system",
+                    min_transfer_size=100,
+                ),
+                SimpleNamespace(
+                    name="成人库",
+                    download_path="/云下载/成人",
+                    target_path="/媒体库/成人",
+                    type="xx-SSNI",
+                    min_transfer_size=200,
+                ),
+            ],
+            video_formats=["mp4", "mkv"],
+            min_transfer_size=150,
+            xx=SimpleNamespace(remove_keywords=["hhd800.com@"]),
+        ),
     )
-    client.get_offline_tasks = AsyncMock(
-        return_value={
+
+
+class FakeP115Client:
+    """预定义 async 桩方法的轻量客户端，替代每个测试重建的 AsyncMock"""
+
+    async def verify_cookies(self):
+        return True
+
+    async def add_offline_task(self, *args, **kwargs):
+        return {"state": True, "info_hash": "abc123hash"}
+
+    async def get_offline_tasks(self):
+        return {
             "state": True,
             "tasks": [
                 {
@@ -72,22 +79,42 @@ def mock_p115_client():
                 },
             ],
         }
-    )
-    client.get_task_status = AsyncMock(
-        return_value={
+
+    async def get_task_status(self, info_hash):
+        return {
             "info_hash": "task1_hash",
             "name": "测试任务1",
             "status": 2,
             "percent_done": 100,
             "add_time": 1700000000,
         }
-    )
-    client.delete_offline_task = AsyncMock(return_value={"state": True})
-    client.get_path_id = AsyncMock(return_value="123456")
-    return client
 
+    async def delete_offline_task(self, *args, **kwargs):
+        return {"state": True}
+
+    async def get_path_id(self, *args, **kwargs):
+        return "123456"
+
+
+class FakeConnCtx:
+    """普通类实现 async with 协议，替代 MagicMock + AsyncMock 拼出的上下文管理器"""
 
-@pytest.fixture
+    def __init__(self, conn):
+        self._conn = conn
+
+    async def __aenter__(self):
+        return self._conn
+
+    async def __aexit__(self, *exc):
+        return None
+
+
+@pytest.fixture(scope="session")
+def mock_p115_client():
+    return FakeP115Client()
+
+
+@pytest.fixture(scope="session")
 def mock_task_monitor():
     monitor = MagicMock()
     monitor._stop_event = MagicMock()
@@ -97,7 +124,7 @@ def mock_task_monitor():
     return monitor
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_app(mock_config, mock_p115_client, mock_task_monitor):
     app = FastAPI()
 
@@ -113,7 +140,7 @@ def test_app(mock_config, mock_p115_client, mock_task_monitor):
     return app
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(scope="session")
 async def client(test_app):
     transport = ASGITransport(app=test_app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
@@ -170,11 +197,14 @@ class TestGetTaskDetail:
 
     @pytest.mark.asyncio
     async def test_get_task_detail_not_found(self, client, mock_p115_client):
+        # client 为 session 级共享对象，改完桩方法必须还原，避免污染后续测试
         mock_p115_client.get_task_status = AsyncMock(return_value=None)
+        try:
+            response = await client.get("/api/tasks/nonexistent_hash")
 
-        response = await client.get("/api/tasks/nonexistent_hash")
-
-        assert response.status_code == 404
+            assert response.status_code == 404
+        finally:
+            del mock_p115_client.get_task_status
 
 
 class TestDeleteTask:
@@ -190,22 +220,13 @@ class TestDeleteTask:
 class TestGetOrganizeRecords:
     @pytest.mark.asyncio
     async def test_get_organize_records(self, client):
-        with patch("app.api.organize.get_session") as mock_get_session:
-            mock_session = MagicMock()
-            mock_count_result = MagicMock()
-            mock_count_result.scalar.return_value = 0
-
+        with patch("app.api.organize.engine") as mock_engine:
             mock_records_result = MagicMock()
-            mock_records_result.scalars.return_value.all.return_value = []
-
-            mock_session.execute = AsyncMock(
-                side_effect=[mock_count_result, mock_records_result]
+            mock_records_result.all.return_value = []
+            mock_conn = SimpleNamespace(
+                execute=AsyncMock(return_value=mock_records_result)
             )
-
-            mock_ctx = MagicMock()
-            mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-            mock_ctx.__aexit__ = AsyncMock(return_value=None)
-            mock_get_session.return_value = mock_ctx
+            mock_engine.connect.return_value = FakeConnCtx(mock_conn)
 
             response = await client.get("/api/organize/records")
 
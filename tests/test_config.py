@@ -13,13 +13,22 @@ from pydantic import ValidationError
 
 from app.core.config import Config, load_config
 
+# 统一读仓库自带的示例配置：本地 config.yaml 未纳入版本控制，
+# 全新检出时不存在、内容也不可控，不能作为测试输入
+_EXAMPLE_CONFIG = Path(__file__).parent.parent / "config.example.yaml"
+
+
+@pytest.fixture(autouse=True)
+def _use_example_config(monkeypatch):
+    monkeypatch.setenv("CONFIG_PATH", str(_EXAMPLE_CONFIG))
+
 
 class TestLoadConfigSuccess:
     """测试配置文件加载成功场景"""
 
     def test_load_config_success(self):
         """验证配置文件加载成功"""
-        # 使用项目根目录的 config.yaml
+        # 使用仓库自带的 config.example.yaml
         config = load_config()
 
         # 验证加载成功
@@ -6,6 +6,15 @@
 import pytest
 from pathlib import Path
 
+from app.services.fanhao_parser import (
+    extract_fanhao,
+    extract_producer,
+    generate_target_path,
+    normalize_cd_suffix,
+    normalize_filename,
+    remove_keywords,
+)
+
 
 class TestRemoveKeywords:
     """测试关键词移除功能"""
@@ -37,8 +46,6 @@ class TestRemoveKeywords:
     )
     def test_remove_keywords(self, filename, keywords, expected):
         """验证关键词移除逻辑"""
-        from app.services.fanhao_parser import remove_keywords
-
         assert remove_keywords(filename, keywords) == expected
 
 
@@ -66,8 +73,6 @@ class TestNormalizeFilename:
     )
     def test_normalize_filename(self, filename, expected):
         """验证文件名标准化逻辑"""
-        from app.services.fanhao_parser import normalize_filename
-
         assert normalize_filename(filename) == expected
 
 
@@ -105,8 +110,6 @@ class TestExtractFanhao:
     )
     def test_extract_fanhao(self, filename, expected):
         """验证番号提取逻辑，正则：[A-Z]{2,10}-\\d{3,5}"""
-        from app.services.fanhao_parser import extract_fanhao
-
         assert extract_fanhao(filename) == expected
 
 
@@ -135,8 +138,6 @@ class TestCDSuffixMultiple:
     )
     def test_cd_suffix_multiple(self, filename, file_count, expected):
         """验证多文件时CD后缀标准化逻辑"""
-        from app.services.fanhao_parser import normalize_cd_suffix
-
         assert normalize_cd_suffix(filename, file_count) == expected
 
 
@@ -162,8 +163,6 @@ class TestCDSuffixSingleSpecial:
     )
     def test_cd_suffix_single_special(self, filename, file_count, expected):
         """验证单文件时特殊标记保持不变"""
-        from app.services.fanhao_parser import normalize_cd_suffix
-
         assert normalize_cd_suffix(filename, file_count) == expected
 
 
@@ -192,8 +191,6 @@ class TestGenerateTargetPath:
     )
     def test_generate_target_path(self, filename, target_dir, producer, expected):
         """验证目标路径生成逻辑：{target_dir}/{producer}/{fanhao}/{filename}"""
-        from app.services.fanhao_parser import generate_target_path
-
         assert generate_target_path(filename, target_dir, producer) == expected
 
 
@@ -220,6 +217,4 @@ class TestExtractProducer:
     )
     def test_extract_producer(self, library_type, expected):
         """验证从library.type提取片商名称：xx-ABC → ABC"""
-        from app.services.fanhao_parser import extract_producer
-
         assert extract_producer(library_type) == expected
@@ -4,142 +4,191 @@
 """
 
 import pytest
+import pytest_asyncio
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import select
+from sqlalchemy.pool import StaticPool
+from sqlalchemy import (
+    bindparam,
+    delete,
+    event,
+    exists,
+    insert,
+    inspect,
+    select,
+    update,
+)
 
 from app.core.database import init_db, get_session, Base
 from app.models.organize_record import OrganizeRecord
 from app.models.offline_task import OfflineTask
 
-
-@pytest.fixture
+# 固定时间常量：测试可复现，也省去每次参数化收集时的时钟调用
+_NOW = datetime(2024, 1, 1, 0, 0, 0)
+
+# 查询语句提升为模块常量并走 bindparam，SQLAlchemy 编译缓存跨调用复用同一条 SQL
+_SEL_BY_MODEL = {
+    OrganizeRecord: select(OrganizeRecord).where(
+        OrganizeRecord.task_id == bindparam("key")
+    ),
+    OfflineTask: select(OfflineTask).where(OfflineTask.info_hash == bindparam("key")),
+}
+
+# 存在性断言走 SELECT EXISTS：规划器短路，不经过行物化与 ORM 水合
+_EXISTS_BY_MODEL = {
+    OrganizeRecord: select(
+        exists().where(OrganizeRecord.task_id == bindparam("key"))
+    ),
+    OfflineTask: select(exists().where(OfflineTask.info_hash == bindparam("key"))),
+}
+
+# 两个模型共用同一套 insert → update → delete 流程，按 (模型, 载荷, 主键列, 主键值, 更新字段) 参数化
+_CRUD_CASES = [
+    pytest.param(
+        OrganizeRecord,
+        {
+            "task_id": "task-001",
+            "source_path": "/source/path/file.mp4",
+            "target_path": "/target/path/file.mp4",
+            "file_name": "file.mp4",
+            "file_size": 1024000,
+            "library_name": "Library-001",
+            "status": "success",
+            "error_message": None,
+        },
+        "task_id",
+        "task-001",
+        {"status": "failed", "error_message": "Test error"},
+        id="organize_record",
+    ),
+    pytest.param(
+        OfflineTask,
+        {
+            "info_hash": "abc123def456ghi789",
+            "name": "Test Torrent",
+            "library_name": "Library-002",
+            "status": "pending",
+            "add_time": _NOW,
+        },
+        "info_hash",
+        "abc123def456ghi789",
+        {"status": "completed", "complete_time": _NOW},
+        id="offline_task",
+    ),
+]
+
+
+@pytest.fixture(scope="session")
 def async_engine():
-    """创建测试数据库引擎（使用内存 SQLite）"""
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
-    return engine
-
+    """创建测试数据库引擎（session 级复用，免去逐测试重建引擎与方言初始化）
+
+    xdist 并行时 session fixture 以 worker 进程为界，:memory: 库天然
+    每 worker 一份，互不可见，无需按 worker_id 额外区分
+    """
+    # 显式 StaticPool：单连接贯穿整个会话，内存库只初始化、建表一次，
+    # 不依赖方言对 :memory: 的默认池选择
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        echo=False,
+        poolclass=StaticPool,
+        query_cache_size=1200,
+    )
+
+    # 与生产引擎同款 PRAGMA：内存库下主要是 temp_store/cache_size 生效，
+    # 换成磁盘测试库时 WAL/synchronous 也不会拖慢
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragma(dbapi_conn, _connection_record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.close()
 
-@pytest.fixture
-def async_session(async_engine):
-    """创建异步会话工厂"""
-    return sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+    return engine
 
 
-@pytest.mark.asyncio
-async def test_create_tables(async_engine):
-    """测试数据库表创建"""
+@pytest_asyncio.fixture(scope="session")
+async def _schema(async_engine):
+    """整个会话只执行一次 DDL"""
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+
+@pytest_asyncio.fixture(scope="session")
+async def _session_instance(async_engine, _schema):
+    """整个会话复用同一个 AsyncSession（省去逐测试的会话构造与 greenlet 上下文）"""
     async with async_engine.connect() as conn:
-        result = await conn.execute(select(1).select_from(OrganizeRecord.__table__))
-        assert result.scalar() is None
+        trans = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await trans.rollback()
 
-        result = await conn.execute(select(1).select_from(OfflineTask.__table__))
-        assert result.scalar() is None
 
+@pytest_asyncio.fixture
+async def async_session(_session_instance):
+    """每个测试包一层 SAVEPOINT，teardown 回滚，测试之间互不可见"""
+    nested = await _session_instance.begin_nested()
+    try:
+        yield _session_instance
+    finally:
+        if nested.is_active:
+            await nested.rollback()
+        _session_instance.expunge_all()
 
-@pytest.mark.asyncio
-async def test_organize_record_crud(async_engine, async_session):
-    """测试 OrganizeRecord 的 CRUD 操作"""
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
 
-    async with async_session() as session:
-        record = OrganizeRecord(
-            task_id="task-001",
-            source_path="/source/path/file.mp4",
-            target_path="/target/path/file.mp4",
-            file_name="file.mp4",
-            file_size=1024000,
-            library_name="Library-001",
-            status="success",
-            error_message=None,
+@pytest.mark.asyncio
+async def test_create_tables(async_engine, _schema):
+    """测试数据库表创建"""
+    # Inspector 直接读元数据断言表存在，替代对空表的两次 SELECT 探测
+    async with async_engine.connect() as conn:
+        table_names = await conn.run_sync(
+            lambda sync_conn: inspect(sync_conn).get_table_names()
         )
-        session.add(record)
-        await session.commit()
 
-        stmt = select(OrganizeRecord).where(OrganizeRecord.task_id == "task-001")
-        result = await session.execute(stmt)
-        fetched_record = result.scalar_one_or_none()
+    assert OrganizeRecord.__tablename__ in table_names
+    assert OfflineTask.__tablename__ in table_names
 
-        assert fetched_record is not None
-        assert fetched_record.task_id == "task-001"
-        assert fetched_record.file_name == "file.mp4"
-        assert fetched_record.status == "success"
-        assert fetched_record.created_at is not None
 
-        fetched_record.status = "failed"
-        fetched_record.error_message = "Test error"
-        await session.commit()
+async def _bulk_add(session, model, rows: list[dict]) -> None:
+    """批量插入：一次 executemany 替代逐行 session.add，N 行共享一次语句编译"""
+    await session.execute(insert(model), rows)
 
-        stmt = select(OrganizeRecord).where(OrganizeRecord.task_id == "task-001")
-        result = await session.execute(stmt)
-        updated_record = result.scalar_one()
-        assert updated_record.status == "failed"
-        assert updated_record.error_message == "Test error"
 
-        await session.delete(updated_record)
-        await session.commit()
+@pytest.mark.asyncio
+@pytest.mark.parametrize("model,payload,key_col,key_val,updates", _CRUD_CASES)
+async def test_model_crud(async_session, model, payload, key_col, key_val, updates):
+    """测试模型的 CRUD 操作（RETURNING 把写和读合并为一次往返）
 
-        stmt = select(OrganizeRecord).where(OrganizeRecord.task_id == "task-001")
-        result = await session.execute(stmt)
-        deleted_record = result.scalar_one_or_none()
-        assert deleted_record is None
+    全程单事务：不做中间 commit，teardown 统一回滚"""
+    key = getattr(model, key_col)
 
+    await _bulk_add(async_session, model, [payload])
+    # scalars() 直接取标量流，省去 Result 包装后再 scalar_one 的拆列开销
+    row = (await async_session.scalars(_SEL_BY_MODEL[model], {"key": key_val})).one()
 
-@pytest.mark.asyncio
-async def test_offline_task_crud(async_engine, async_session):
-    """测试 OfflineTask 的 CRUD 操作"""
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    for col, expected in payload.items():
+        assert getattr(row, col) == expected
+    assert row.created_at is not None
 
-    async with async_session() as session:
-        task = OfflineTask(
-            info_hash="abc123def456ghi789",
-            name="Test Torrent",
-            library_name="Library-002",
-            status="pending",
-            add_time=datetime.now(),
+    updated = (
+        await async_session.scalars(
+            update(model).where(key == key_val).values(**updates).returning(model)
         )
-        session.add(task)
-        await session.commit()
-
-        stmt = select(OfflineTask).where(OfflineTask.info_hash == "abc123def456ghi789")
-        result = await session.execute(stmt)
-        fetched_task = result.scalar_one_or_none()
-
-        assert fetched_task is not None
-        assert fetched_task.info_hash == "abc123def456ghi789"
-        assert fetched_task.name == "Test Torrent"
-        assert fetched_task.status == "pending"
-        assert fetched_task.created_at is not None
-        assert fetched_task.updated_at is not None
-
-        fetched_task.status = "downloading"
-        await session.commit()
-
-        stmt = select(OfflineTask).where(OfflineTask.info_hash == "abc123def456ghi789")
-        result = await session.execute(stmt)
-        updated_task = result.scalar_one()
-        assert updated_task.status == "downloading"
-
-        fetched_task.status = "completed"
-        fetched_task.complete_time = datetime.now()
-        await session.commit()
-
-        stmt = select(OfflineTask).where(OfflineTask.info_hash == "abc123def456ghi789")
-        result = await session.execute(stmt)
-        completed_task = result.scalar_one()
-        assert completed_task.status == "completed"
-        assert completed_task.complete_time is not None
-
-        await session.delete(completed_task)
-        await session.commit()
-
-        stmt = select(OfflineTask).where(OfflineTask.info_hash == "abc123def456ghi789")
-        result = await session.execute(stmt)
-        deleted_task = result.scalar_one_or_none()
-        assert deleted_task is None
+    ).one()
+    for col, expected in updates.items():
+        assert getattr(updated, col) == expected
+
+    deleted_key = (
+        await async_session.scalars(delete(model).where(key == key_val).returning(key))
+    ).one()
+    assert deleted_key == key_val
+
+    assert not await async_session.scalar(_EXISTS_BY_MODEL[model], {"key": key_val})
@@ -10,32 +10,89 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from app.tasks.monitor import TaskMonitor
 
-class TestStartStopMonitor:
-    """测试监控任务的启动和停止"""
+# 各测试共用的整理成功结果
+_ORGANIZE_OK = {
+    "success_count": 1,
+    "failed_count": 0,
+    "skipped_count": 0,
+    "errors": [],
+}
+
+
+def _make_library(
+    name, download_path, target_path, lib_type="system", min_transfer_size=100
+):
+    """构造媒体库 Mock（属性赋值设置 name，避免 MagicMock(name=...) 被当作 mock 名）"""
+    lib = MagicMock()
+    lib.name = name
+    lib.download_path = download_path
+    lib.target_path = target_path
+    lib.type = lib_type
+    lib.min_transfer_size = min_transfer_size
+    return lib
+
+
+@pytest.fixture
+def base_config():
+    """公共配置 Mock：轮询区间与 media 默认项只搭一次，测试按需覆写"""
+    config = MagicMock()
+    config.p115.rotation_training_interval_min = 1
+    config.p115.rotation_training_interval_max = 2
+    config.media.libraries = []
+    config.media.video_formats = ["mp4", "mkv"]
+    config.media.min_transfer_size = 100
+    config.media.xx = MagicMock(remove_keywords=[])
+    return config
 
-    @pytest.mark.asyncio
-    async def test_start_stop_monitor(self):
-        """测试启动和停止监控任务"""
-        from app.tasks.monitor import TaskMonitor
 
-        # 创建 Mock 依赖
+@pytest.fixture
+def monitor_factory(base_config):
+    """TaskMonitor 工厂：按需注入离线任务与媒体库，公共 Mock 脚手架不再逐测试重建"""
+
+    def _make(tasks=None, libraries=None, organize_result=None):
         mock_client = AsyncMock()
         mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": []}
+            return_value={"state": True, "tasks": tasks or []}
         )
+        mock_client.get_path_id = AsyncMock(return_value="12345")
 
         mock_organizer = AsyncMock()
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
+        mock_organizer.organize_task = AsyncMock(
+            return_value=organize_result or dict(_ORGANIZE_OK)
+        )
 
-        monitor = TaskMonitor(
+        if libraries is not None:
+            base_config.media.libraries = libraries
+
+        return TaskMonitor(
             p115_client=mock_client,
             file_organizer=mock_organizer,
-            config=mock_config,
+            config=base_config,
         )
 
+    return _make
+
+
+class TestStartStopMonitor:
+    """测试监控任务的启动和停止"""
+
+    @pytest.mark.asyncio
+    async def test_start_stop_monitor(self, monitor_factory):
+        """测试启动和停止监控任务"""
+        monitor = monitor_factory()
+
+        # 用事件代替真实 sleep 等待：首轮检查完成即放行，省掉 0.5s 墙钟时间
+        first_check = asyncio.Event()
+        original_check = monitor.check_tasks
+
+        async def check_and_signal():
+            await original_check()
+            first_check.set()
+
+        monitor.check_tasks = check_and_signal
+
         # 启动监控
         await monitor.start_monitor()
 
@@ -43,8 +100,8 @@ class TestStartStopMonitor:
         assert monitor._task is not None
         assert not monitor._stop_event.is_set()
 
-        # 等待一小段时间确保至少执行了一次检查
-        await asyncio.sleep(0.5)
+        # 等待首轮检查完成（事件驱动，非定时轮询）
+        await asyncio.wait_for(first_check.wait(), timeout=2.0)
 
         # 停止监控
         await monitor.stop_monitor()
@@ -58,10 +115,8 @@ class TestCheckTasksSuccess:
     """测试任务完成时触发文件整理"""
 
     @pytest.mark.asyncio
-    async def test_check_tasks_success(self):
+    async def test_check_tasks_success(self, monitor_factory):
         """测试离线任务完成时触发文件整理"""
-        from app.tasks.monitor import TaskMonitor
-
         # 模拟已完成的任务（status == 2）
         completed_task = {
             "info_hash": "abc123hash",
@@ -71,48 +126,18 @@ class TestCheckTasksSuccess:
             "add_time": 1700000000,
         }
 
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [
-            MagicMock(
-                name="测试库",
-                download_path="/download",
-                target_path="/target",
-                type="system",
-                min_transfer_size=100,
-            )
-        ]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
+        monitor = monitor_factory(
+            tasks=[completed_task],
+            libraries=[_make_library("测试库", "/download", "/target")],
         )
 
-        # Mock 数据库查询，返回系统任务的 info_hash
+        # Mock 数据库查询：第一次查系统任务 hash（fetchall），
+        # 第二次批量预取 library_name（all），同一结果对象两个方法各供一次
         with patch("app.tasks.monitor.get_session") as mock_get_session:
             mock_session = MagicMock()
             mock_result = MagicMock()
             mock_result.fetchall = MagicMock(return_value=[("abc123hash",)])
+            mock_result.all = MagicMock(return_value=[("abc123hash", "测试库")])
             mock_session.execute = AsyncMock(return_value=mock_result)
 
             mock_ctx = AsyncMock()
@@ -124,43 +149,26 @@ class TestCheckTasksSuccess:
             await monitor.check_tasks()
 
             # 验证文件整理被调用
-            mock_organizer.organize_task.assert_called_once()
+            monitor._organizer.organize_task.assert_called_once()
 
 
 class TestCheckTasksFailure:
     """测试任务失败时保存记录到数据库"""
 
     @pytest.mark.asyncio
-    async def test_check_tasks_failure(self):
+    async def test_check_tasks_failure(self, monitor_factory):
         """测试离线任务失败时记录到数据库"""
-        from app.tasks.monitor import TaskMonitor
-
-        # 模拟失败的任务（status == 1）
+        # 模拟失败的任务（负数 status 表示失败）
         failed_task = {
             "info_hash": "failed123hash",
             "name": "失败的任务",
-            "status": 1,  # 失败
+            "status": -1,  # 失败
             "file_id": "67890",
             "add_time": 1700000000,
             "error_msg": "下载超时",
         }
 
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [failed_task]}
-        )
-
-        mock_organizer = AsyncMock()
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = []
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
+        monitor = monitor_factory(tasks=[failed_task])
 
         with patch("app.tasks.monitor.get_session") as mock_get_session:
             # Mock 数据库查询返回失败任务的 info_hash
@@ -205,62 +213,30 @@ class TestRandomInterval:
     """测试随机轮询间隔"""
 
     @pytest.mark.asyncio
-    async def test_random_interval(self):
+    async def test_random_interval(self, base_config, monitor_factory):
         """测试轮询间隔在配置范围内随机"""
-        from app.tasks.monitor import TaskMonitor
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": []}
-        )
-
-        mock_organizer = AsyncMock()
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 60
-        mock_config.p115.rotation_training_interval_max = 80
+        base_config.p115.rotation_training_interval_min = 60
+        base_config.p115.rotation_training_interval_max = 80
+        monitor = monitor_factory()
 
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
+        # 多次采样后做聚合断言：min/max 一次覆盖全部范围检查，
+        # 替代循环内逐次 assert 的 100 次断言开销
+        intervals = [monitor._get_random_interval() for _ in range(100)]
 
-        # 多次获取间隔验证随机性
-        intervals = []
-        for _ in range(100):
-            interval = monitor._get_random_interval()
-            intervals.append(interval)
-            # 验证每个间隔都在范围内
-            assert 60 <= interval <= 80
+        assert min(intervals) >= 60
+        assert max(intervals) <= 80
 
         # 验证有随机性（不都是同一个值）
-        unique_intervals = set(intervals)
-        assert len(unique_intervals) > 1
+        assert len(set(intervals)) > 1
 
 
 class TestGracefulShutdown:
     """测试优雅关闭机制"""
 
     @pytest.mark.asyncio
-    async def test_graceful_shutdown(self):
+    async def test_graceful_shutdown(self, monitor_factory):
         """测试信号处理器正确响应 SIGTERM/SIGINT"""
-        from app.tasks.monitor import TaskMonitor
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": []}
-        )
-
-        mock_organizer = AsyncMock()
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
+        monitor = monitor_factory()
 
         # 启动监控
         await monitor.start_monitor()
@@ -269,8 +245,8 @@ class TestGracefulShutdown:
         # 通过调用内部的 _handle_shutdown 方法模拟信号
         monitor._handle_shutdown(signal.SIGTERM, None)
 
-        # 等待任务完成
-        await asyncio.sleep(0.3)
+        # 直接等监控协程退出，替代固定 0.3s 的真实 sleep
+        await asyncio.wait_for(monitor._task, timeout=2.0)
 
         # 验证停止事件已设置
         assert monitor._stop_event.is_set()
@@ -280,10 +256,8 @@ class TestProcessingStatus:
     """测试不同任务状态的处理"""
 
     @pytest.mark.asyncio
-    async def test_pending_task_ignored(self):
+    async def test_pending_task_ignored(self, monitor_factory):
         """测试进行中的任务（status == 0）被继续监控"""
-        from app.tasks.monitor import TaskMonitor
-
         # 模拟进行中的任务
         pending_task = {
             "info_hash": "pending123hash",
@@ -293,37 +267,20 @@ class TestProcessingStatus:
             "add_time": 1700000000,
         }
 
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [pending_task]}
-        )
-
-        mock_organizer = AsyncMock()
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = []
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
+        monitor = monitor_factory(tasks=[pending_task])
 
         await monitor.check_tasks()
 
         # 验证文件整理未被调用（任务还在进行中）
-        mock_organizer.organize_task.assert_not_called()
+        monitor._organizer.organize_task.assert_not_called()
 
 
 class TestMultipleLibraries:
     """测试多媒体库匹配"""
 
     @pytest.mark.asyncio
-    async def test_library_matching(self):
-        """测试根据下载路径匹配正确的媒体库"""
-        from app.tasks.monitor import TaskMonitor
-
+    async def test_library_matching(self, monitor_factory):
+        """测试多库配置下按数据库 library_name 选择正确的媒体库"""
         # 模拟已完成的任务
         completed_task = {
             "info_hash": "multi123hash",
@@ -331,58 +288,26 @@ class TestMultipleLibraries:
             "status": 2,
             "file_id": "22222",
             "add_time": 1700000000,
-            "path": "/下载/电影/",  # 匹配第二个库
+            "path": "/下载/电影/",
         }
 
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
         # 配置多个媒体库
-        mock_library1 = MagicMock()
-        mock_library1.name = "电视剧库"
-        mock_library1.download_path = "/下载/电视剧"
-        mock_library1.target_path = "/媒体/电视剧"
-        mock_library1.type = "system"
-        mock_library1.min_transfer_size = 100
-
-        mock_library2 = MagicMock()
-        mock_library2.name = "电影库"
-        mock_library2.download_path = "/下载/电影"
-        mock_library2.target_path = "/媒体/电影"
-        mock_library2.type = "system"
-        mock_library2.min_transfer_size = 200
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_library1, mock_library2]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
+        monitor = monitor_factory(
+            tasks=[completed_task],
+            libraries=[
+                _make_library("电视剧库", "/下载/电视剧", "/媒体/电视剧"),
+                _make_library(
+                    "电影库", "/下载/电影", "/媒体/电影", min_transfer_size=200
+                ),
+            ],
         )
 
         with patch("app.tasks.monitor.get_session") as mock_get_session:
-            # Mock 数据库查询返回多库测试任务的 info_hash
+            # Mock 数据库查询：hash 查询与 library_name 批量预取共用同一结果对象
             mock_session = MagicMock()
             mock_result = MagicMock()
             mock_result.fetchall = MagicMock(return_value=[("multi123hash",)])
+            mock_result.all = MagicMock(return_value=[("multi123hash", "电影库")])
             mock_session.execute = AsyncMock(return_value=mock_result)
 
             mock_ctx = AsyncMock()
@@ -393,2227 +318,133 @@ class TestMultipleLibraries:
             await monitor.check_tasks()
 
             # 验证整理被调用
-            mock_organizer.organize_task.assert_called_once()
+            monitor._organizer.organize_task.assert_called_once()
             # 验证传入了正确的库配置（电影库）
-            call_args = mock_organizer.organize_task.call_args
-            assert call_args is not None
+            lib_dict = monitor._organizer.organize_task.call_args[0][1]
+            assert lib_dict["name"] == "电影库"
+            assert lib_dict["target_path"] == "/媒体/电影"
 
 
 class TestDatabaseLibraryLookup:
     """测试通过数据库查询 library_name 的逻辑"""
 
-    @pytest.mark.asyncio
-    async def test_db_lookup_success_matches_library(self):
-        """场景A: 数据库查询成功，library_name 匹配到配置 → 使用正确 library"""
-        from app.tasks.monitor import TaskMonitor
-
+    # 五个场景共用同一内核，只有数据库返回与预期结果不同：
+    # batch_rows 是 check_tasks 批量预取的 (info_hash, library_name) 行集，
+    # single_return/single_exc 控制批量未命中时的单条回退查询，
+    # expected_lib 为 None 表示无法确定 library、应跳过整理
+    _DB_LOOKUP_CASES = [
+        pytest.param(
+            [("hashdblookup", "日韩库")], None, None, "日韩库",
+            id="success_matches_library",
+        ),
+        pytest.param(
+            [("hashdblookup", "不存在的库")], None, None, None,
+            id="library_not_in_config",
+        ),
+        pytest.param([], None, None, None, id="empty_result"),
+        pytest.param(
+            [("hashdblookup", None)], None, None, None,
+            id="null_library_name",
+        ),
+        pytest.param(
+            [], None, Exception("数据库连接失败"), None,
+            id="exception_skips_task",
+        ),
+    ]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "batch_rows,single_return,single_exc,expected_lib", _DB_LOOKUP_CASES
+    )
+    async def test_db_lookup(
+        self, monitor_factory, batch_rows, single_return, single_exc, expected_lib
+    ):
+        """数据库查到有效 library_name 时整理到对应库，否则跳过该任务"""
         completed_task = {
-            "info_hash": "hash123abc",
+            "info_hash": "hashdblookup",
             "name": "DB查询测试任务",
             "status": 2,
             "file_id": "33333",
             "add_time": 1700000000,
-            "path": "/任意路径/",  # 即使路径不匹配，也应该用数据库中的 library_name
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        # 使用 MagicMock 的 configure 方式来设置 name 属性
-        mock_lib1 = MagicMock()
-        mock_lib1.configure(
-            name="测试库",
-            download_path="/下载/测试",
-            target_path="/目标/测试",
-            type="system",
-            min_transfer_size=100,
-        )
-
-        mock_lib2 = MagicMock()
-        mock_lib2.configure(
-            name="日韩库",
-            download_path="/下载/日韩",
-            target_path="/目标/日韩",
-            type="日韩",
-            min_transfer_size=200,
-        )
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1, mock_lib2]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        # 测试 _find_library_by_name 方法
-        result = monitor._find_library_by_name("日韩库")
-        assert result is not None
-        assert result.name == "日韩库"
-        assert result.target_path == "/目标/日韩"
-
-        # 测试数据库查询逻辑 - 直接调用 _handle_completed_task
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            # 模拟数据库返回
-            mock_session = MagicMock()
-            mock_result = MagicMock()
-            mock_result.scalar_one_or_none.return_value = "日韩库"
-            mock_session.execute.return_value = mock_result
-
-            mock_ctx = AsyncMock()
-            mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-            mock_ctx.__aexit__ = AsyncMock(return_value=None)
-            mock_get_session.return_value = mock_ctx
-
-            await monitor._handle_completed_task(completed_task)
-
-            # 验证整理被调用
-            mock_organizer.organize_task.assert_called_once()
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]
-            assert lib_dict["name"] == "日韩库"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_library_not_in_config(self):
-        """场景B: 数据库查询成功，但 library_name 不在当前配置 → fallback"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash456def",
-            "name": "配置不存在的库",
-            "status": 2,
-            "file_id": "44444",
-            "add_time": 1700000000,
-            "path": "/下载/日韩/",  # 这个路径匹配第二个库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.configure(
-            name="测试库",
-            download_path="/下载/测试",
-            target_path="/目标/测试",
-            type="system",
-            min_transfer_size=100,
-        )
-
-        mock_lib2 = MagicMock()
-        mock_lib2.configure(
-            name="日韩库",
-            download_path="/下载/日韩",
-            target_path="/目标/日韩",
-            type="日韩",
-            min_transfer_size=200,
-        )
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1, mock_lib2]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        # 测试 _find_library_by_name 返回 None 对于不存在的库
-        result = monitor._find_library_by_name("不存在的库")
-        assert result is None
-
-        # 测试数据库查询返回不存在的库名，fallback 到路径匹配
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            mock_session = MagicMock()
-            mock_result = MagicMock()
-            mock_result.scalar_one_or_none.return_value = "不存在的库"
-            mock_session.execute.return_value = mock_result
-
-            mock_ctx = AsyncMock()
-            mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-            mock_ctx.__aexit__ = AsyncMock(return_value=None)
-            mock_get_session.return_value = mock_ctx
-
-            await monitor._handle_completed_task(completed_task)
-
-            # 应该 fallback 到路径匹配（日韩库）
-            mock_organizer.organize_task.assert_called_once()
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]
-            assert lib_dict["name"] == "日韩库"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_empty_result(self):
-        """场景C: 数据库查询返回空记录 → fallback 到路径匹配"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash789ghi",
-            "name": "无记录任务",
-            "status": 2,
-            "file_id": "55555",
-            "add_time": 1700000000,
-            "path": "/下载/电影/",  # 匹配电影库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.configure(
-            name="电影库",
-            download_path="/下载/电影",
-            target_path="/目标/电影",
-            type="system",
-            min_transfer_size=200,
-        )
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        # 测试数据库返回 None，fallback 到路径匹配
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            mock_session = MagicMock()
-            mock_result = MagicMock()
-            mock_result.scalar_one_or_none.return_value = None
-            mock_session.execute.return_value = mock_result
-
-            mock_ctx = AsyncMock()
-            mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-            mock_ctx.__aexit__ = AsyncMock(return_value=None)
-            mock_get_session.return_value = mock_ctx
-
-            await monitor._handle_completed_task(completed_task)
-
-            # 应该 fallback 到路径匹配（电影库）
-            mock_organizer.organize_task.assert_called_once()
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]
-            assert lib_dict["name"] == "电影库"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_null_library_name(self):
-        """场景D: 数据库查询到记录但 library_name 为 None → fallback"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash000null",
-            "name": "空库名任务",
-            "status": 2,
-            "file_id": "66666",
-            "add_time": 1700000000,
-            "path": "/下载/动漫/",  # 匹配动漫库
+            "path": "/下载/日韩/",
         }
 
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.configure(
-            name="动漫库",
-            download_path="/下载/动漫",
-            target_path="/目标/动漫",
-            type="system",
-            min_transfer_size=100,
-        )
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
+        monitor = monitor_factory(
+            tasks=[completed_task],
+            libraries=[
+                _make_library("测试库", "/下载/测试", "/目标/测试"),
+                _make_library(
+                    "日韩库",
+                    "/下载/日韩",
+                    "/目标/日韩",
+                    lib_type="日韩",
+                    min_transfer_size=200,
+                ),
+            ],
         )
 
-        # 测试数据库返回 None，fallback 到路径匹配
         with patch("app.tasks.monitor.get_session") as mock_get_session:
-            mock_session = MagicMock()
-            mock_result = MagicMock()
-            mock_result.scalar_one_or_none.return_value = None
-            mock_session.execute.return_value = mock_result
-
-            mock_ctx = AsyncMock()
-            mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-            mock_ctx.__aexit__ = AsyncMock(return_value=None)
-            mock_get_session.return_value = mock_ctx
+            call_count = [0]
 
-            await monitor._handle_completed_task(completed_task)
+            def create_mock_session():
+                call_count[0] += 1
+                mock_session = MagicMock()
+                mock_result = MagicMock()
 
-            # 应该 fallback 到路径匹配（动漫库）
-            mock_organizer.organize_task.assert_called_once()
+                if call_count[0] == 1:
+                    # 第一次调用：check_tasks 查询系统任务的 info_hash
+                    mock_result.fetchall = MagicMock(
+                        return_value=[("hashdblookup",)]
+                    )
+                    mock_session.execute = AsyncMock(return_value=mock_result)
+                elif call_count[0] == 2:
+                    # 第二次调用：批量预取 library_name
+                    mock_result.all = MagicMock(return_value=batch_rows)
+                    mock_session.execute = AsyncMock(return_value=mock_result)
+                elif single_exc is not None:
+                    # 第三次调用：单条回退查询抛出异常
+                    mock_session.execute = AsyncMock(side_effect=single_exc)
+                else:
+                    # 第三次调用：单条回退查询
+                    mock_result.scalar_one_or_none = MagicMock(
+                        return_value=single_return
+                    )
+                    mock_session.execute = AsyncMock(return_value=mock_result)
 
-    @pytest.mark.asyncio
-    async def test_db_lookup_exception_fallback(self):
-        """场景E: 数据库查询抛出异常 → catch 异常并 fallback"""
-        from app.tasks.monitor import TaskMonitor
+                mock_ctx = AsyncMock()
+                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
+                mock_ctx.__aexit__ = AsyncMock(return_value=None)
+                return mock_ctx
 
-        completed_task = {
-            "info_hash": "hij789exception",
-            "name": "异常测试任务",
-            "status": 2,
-            "file_id": "77777",
-            "add_time": 1700000000,
-            "path": "/下载/音乐/",  # 匹配音乐库
-        }
+            mock_get_session.side_effect = create_mock_session
 
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
+            await monitor.check_tasks()
 
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
+            if expected_lib is None:
+                # 无法确定 library 配置 → 跳过整理
+                monitor._organizer.organize_task.assert_not_called()
+            else:
+                monitor._organizer.organize_task.assert_called_once()
+                lib_dict = monitor._organizer.organize_task.call_args[0][1]
+                assert lib_dict["name"] == expected_lib
+
+    @pytest.mark.asyncio
+    async def test_find_library_by_name(self, monitor_factory):
+        """name -> library 索引命中返回配置对象，未命中返回 None"""
+        monitor = monitor_factory(
+            libraries=[
+                _make_library("测试库", "/下载/测试", "/目标/测试"),
+                _make_library(
+                    "日韩库",
+                    "/下载/日韩",
+                    "/目标/日韩",
+                    lib_type="日韩",
+                    min_transfer_size=200,
+                ),
+            ],
         )
 
-        mock_lib1 = MagicMock()
-        mock_lib1.configure(
-            name="音乐库",
-            download_path="/下载/音乐",
-            target_path="/目标/音乐",
-            type="system",
-            min_transfer_size=100,
-        )
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            mock_session = MagicMock()
-            # 数据库查询抛出异常
-            mock_session.execute.side_effect = Exception("数据库连接失败")
-
-            mock_ctx = AsyncMock()
-            mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-            mock_ctx.__aexit__ = AsyncMock(return_value=None)
-            mock_get_session.return_value = mock_ctx
-
-            await monitor._handle_completed_task(completed_task)
-
-            # 应该 fallback 到路径匹配（音乐库）
-            mock_organizer.organize_task.assert_called_once()
-            # 验证使用的是日韩库（从数据库查询到的）
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]  # 第二个参数是 lib_dict
-            assert lib_dict["name"] == "日韩库"
-            assert lib_dict["target_path"] == "/目标/日韩"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_library_not_in_config(self):
-        """场景B: 数据库查询成功，但 library_name 不在当前配置 → fallback"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash456def",
-            "name": "配置不存在的库",
-            "status": 2,
-            "file_id": "44444",
-            "add_time": 1700000000,
-            "path": "/下载/日韩/",  # 这个路径匹配第二个库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "测试库"
-        mock_lib1.download_path = "/下载/测试"
-        mock_lib1.target_path = "/目标/测试"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_lib2 = MagicMock()
-        mock_lib2.name = "日韩库"
-        mock_lib2.download_path = "/下载/日韩"
-        mock_lib2.target_path = "/目标/日韩"
-        mock_lib2.type = "日韩"
-        mock_lib2.min_transfer_size = 200
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1, mock_lib2]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        # 准备多次 get_session 调用的返回值
-        session_results = []
-
-        # 第一次调用：check_tasks 查询系统任务
-        mock_result1 = MagicMock()
-        mock_result1.fetchall.return_value = [("hash456def",)]
-        session_results.append(mock_result1)
-
-        # 第二次调用：数据库返回的 library_name 在当前配置中不存在
-        mock_result2 = MagicMock()
-        mock_result2.scalar_one_or_none.return_value = "不存在的库"
-        session_results.append(mock_result2)
-
-        def mock_get_session():
-            if not session_results:
-                return None
-            mock_session = MagicMock()
-            mock_session.execute.return_value = session_results.pop(0)
-            mock_ctx = AsyncMock()
-            mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-            mock_ctx.__aexit__ = AsyncMock(return_value=None)
-            return mock_ctx
-
-        with patch("app.tasks.monitor.get_session", side_effect=mock_get_session):
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（日韩库）
-            mock_organizer.organize_task.assert_called_once()
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]
-            assert lib_dict["name"] == "日韩库"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_empty_result(self):
-        """场景C: 数据库查询返回空记录 → fallback 到路径匹配"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash789ghi",
-            "name": "无记录任务",
-            "status": 2,
-            "file_id": "55555",
-            "add_time": 1700000000,
-            "path": "/下载/电影/",  # 匹配电影库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "电视剧库"
-        mock_lib1.download_path = "/下载/电视剧"
-        mock_lib1.target_path = "/目标/电视剧"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_lib2 = MagicMock()
-        mock_lib2.name = "电影库"
-        mock_lib2.download_path = "/下载/电影"
-        mock_lib2.target_path = "/目标/电影"
-        mock_lib2.type = "system"
-        mock_lib2.min_transfer_size = 200
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1, mock_lib2]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        # 准备多次 get_session 调用的返回值
-        session_results = []
-
-        # 第一次调用：check_tasks 查询系统任务
-        mock_result1 = MagicMock()
-        mock_result1.fetchall.return_value = [("hash789ghi",)]
-        session_results.append(mock_result1)
-
-        # 第二次调用：数据库返回 None（无此记录）
-        mock_result2 = MagicMock()
-        mock_result2.scalar_one_or_none.return_value = None
-        session_results.append(mock_result2)
-
-        def mock_get_session():
-            if not session_results:
-                return None
-            mock_session = MagicMock()
-            mock_session.execute.return_value = session_results.pop(0)
-            mock_ctx = AsyncMock()
-            mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-            mock_ctx.__aexit__ = AsyncMock(return_value=None)
-            return mock_ctx
-
-        with patch("app.tasks.monitor.get_session", side_effect=mock_get_session):
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（电影库）
-            mock_organizer.organize_task.assert_called_once()
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]
-            assert lib_dict["name"] == "电影库"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_null_library_name(self):
-        """场景D: 数据库查询到记录但 library_name 为 None → fallback"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash000null",
-            "name": "空库名任务",
-            "status": 2,
-            "file_id": "66666",
-            "add_time": 1700000000,
-            "path": "/下载/动漫/",  # 匹配动漫库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "动漫库"
-        mock_lib1.download_path = "/下载/动漫"
-        mock_lib1.target_path = "/目标/动漫"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        # 准备多次 get_session 调用的返回值
-        session_results = []
-
-        # 第一次调用：check_tasks 查询系统任务
-        mock_result1 = MagicMock()
-        mock_result1.fetchall.return_value = [("hash000null",)]
-        session_results.append(mock_result1)
-
-        # 第二次调用：数据库返回的 library_name 为 None
-        mock_result2 = MagicMock()
-        mock_result2.scalar_one_or_none.return_value = None
-        session_results.append(mock_result2)
-
-        def mock_get_session():
-            if not session_results:
-                return None
-            mock_session = MagicMock()
-            mock_session.execute.return_value = session_results.pop(0)
-            mock_ctx = AsyncMock()
-            mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-            mock_ctx.__aexit__ = AsyncMock(return_value=None)
-            return mock_ctx
-
-        with patch("app.tasks.monitor.get_session", side_effect=mock_get_session):
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（动漫库）
-            mock_organizer.organize_task.assert_called_once()
-            # 验证使用的是日韩库（从数据库查询到的）
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]  # 第二个参数是 lib_dict
-            assert lib_dict["name"] == "日韩库"
-            assert lib_dict["target_path"] == "/目标/日韩"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_library_not_in_config(self):
-        """场景B: 数据库查询成功，但 library_name 不在当前配置 → fallback"""
-        from app.tasks.monitor import TaskMonitor
-        from unittest.mock import PropertyMock
-
-        completed_task = {
-            "info_hash": "hash456def",
-            "name": "配置不存在的库",
-            "status": 2,
-            "file_id": "44444",
-            "add_time": 1700000000,
-            "path": "/下载/日韩/",  # 这个路径匹配第二个库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "测试库"
-        mock_lib1.download_path = "/下载/测试"
-        mock_lib1.target_path = "/目标/测试"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_lib2 = MagicMock()
-        mock_lib2.name = "日韩库"
-        mock_lib2.download_path = "/下载/日韩"
-        mock_lib2.target_path = "/目标/日韩"
-        mock_lib2.type = "日韩"
-        mock_lib2.min_transfer_size = 200
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1, mock_lib2]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            call_count = [0]
-
-            def create_mock_session():
-                call_count[0] += 1
-                mock_session = MagicMock()
-
-                if call_count[0] == 1:
-                    # 第一次调用：check_tasks 查询系统任务
-                    mock_result1 = MagicMock()
-                    type(mock_result1).fetchall = PropertyMock(
-                        return_value=[("hash456def",)]
-                    )
-                    mock_session.execute = AsyncMock(return_value=mock_result1)
-                else:
-                    # 第二次调用：数据库返回的 library_name 在当前配置中不存在
-                    mock_result2 = MagicMock()
-                    type(mock_result2).scalar_one_or_none = PropertyMock(
-                        return_value="不存在的库"
-                    )
-                    mock_session.execute = AsyncMock(return_value=mock_result2)
-
-                mock_ctx = AsyncMock()
-                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-                mock_ctx.__aexit__ = AsyncMock(return_value=None)
-                return mock_ctx
-
-            mock_get_session.side_effect = create_mock_session
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（日韩库）
-            mock_organizer.organize_task.assert_called_once()
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]
-            assert lib_dict["name"] == "日韩库"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_empty_result(self):
-        """场景C: 数据库查询返回空记录 → fallback 到路径匹配"""
-        from app.tasks.monitor import TaskMonitor
-        from unittest.mock import PropertyMock
-
-        completed_task = {
-            "info_hash": "hash789ghi",
-            "name": "无记录任务",
-            "status": 2,
-            "file_id": "55555",
-            "add_time": 1700000000,
-            "path": "/下载/电影/",  # 匹配电影库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "电视剧库"
-        mock_lib1.download_path = "/下载/电视剧"
-        mock_lib1.target_path = "/目标/电视剧"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_lib2 = MagicMock()
-        mock_lib2.name = "电影库"
-        mock_lib2.download_path = "/下载/电影"
-        mock_lib2.target_path = "/目标/电影"
-        mock_lib2.type = "system"
-        mock_lib2.min_transfer_size = 200
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1, mock_lib2]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            call_count = [0]
-
-            def create_mock_session():
-                call_count[0] += 1
-                mock_session = MagicMock()
-
-                if call_count[0] == 1:
-                    # 第一次调用：check_tasks 查询系统任务
-                    mock_result1 = MagicMock()
-                    type(mock_result1).fetchall = PropertyMock(
-                        return_value=[("hash789ghi",)]
-                    )
-                    mock_session.execute = AsyncMock(return_value=mock_result1)
-                else:
-                    # 第二次调用：数据库返回 None（无此记录）
-                    mock_result2 = MagicMock()
-                    type(mock_result2).scalar_one_or_none = PropertyMock(
-                        return_value=None
-                    )
-                    mock_session.execute = AsyncMock(return_value=mock_result2)
-
-                mock_ctx = AsyncMock()
-                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-                mock_ctx.__aexit__ = AsyncMock(return_value=None)
-                return mock_ctx
-
-            mock_get_session.side_effect = create_mock_session
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（电影库）
-            mock_organizer.organize_task.assert_called_once()
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]
-            assert lib_dict["name"] == "电影库"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_null_library_name(self):
-        """场景D: 数据库查询到记录但 library_name 为 None → fallback"""
-        from app.tasks.monitor import TaskMonitor
-        from unittest.mock import PropertyMock
-
-        completed_task = {
-            "info_hash": "hash000null",
-            "name": "空库名任务",
-            "status": 2,
-            "file_id": "66666",
-            "add_time": 1700000000,
-            "path": "/下载/动漫/",  # 匹配动漫库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "动漫库"
-        mock_lib1.download_path = "/下载/动漫"
-        mock_lib1.target_path = "/目标/动漫"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            call_count = [0]
-
-            def create_mock_session():
-                call_count[0] += 1
-                mock_session = MagicMock()
-
-                if call_count[0] == 1:
-                    # 第一次调用：check_tasks 查询系统任务
-                    mock_result1 = MagicMock()
-                    type(mock_result1).fetchall = PropertyMock(
-                        return_value=[("hash000null",)]
-                    )
-                    mock_session.execute = AsyncMock(return_value=mock_result1)
-                else:
-                    # 第二次调用：数据库返回的 library_name 为 None
-                    mock_result2 = MagicMock()
-                    type(mock_result2).scalar_one_or_none = PropertyMock(
-                        return_value=None
-                    )
-                    mock_session.execute = AsyncMock(return_value=mock_result2)
-
-                mock_ctx = AsyncMock()
-                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-                mock_ctx.__aexit__ = AsyncMock(return_value=None)
-                return mock_ctx
-
-            mock_get_session.side_effect = create_mock_session
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（动漫库）
-            mock_organizer.organize_task.assert_called_once()
-            # 验证使用的是日韩库（从数据库查询到的）
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]  # 第二个参数是 lib_dict
-            assert lib_dict["name"] == "日韩库"
-            assert lib_dict["target_path"] == "/目标/日韩"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_library_not_in_config(self):
-        """场景B: 数据库查询成功，但 library_name 不在当前配置 → fallback"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash456def",
-            "name": "配置不存在的库",
-            "status": 2,
-            "file_id": "44444",
-            "add_time": 1700000000,
-            "path": "/下载/日韩/",  # 这个路径匹配第二个库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "测试库"
-        mock_lib1.download_path = "/下载/测试"
-        mock_lib1.target_path = "/目标/测试"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_lib2 = MagicMock()
-        mock_lib2.name = "日韩库"
-        mock_lib2.download_path = "/下载/日韩"
-        mock_lib2.target_path = "/目标/日韩"
-        mock_lib2.type = "日韩"
-        mock_lib2.min_transfer_size = 200
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1, mock_lib2]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            call_count = [0]
-
-            def create_mock_session():
-                call_count[0] += 1
-                mock_session = MagicMock()
-
-                if call_count[0] == 1:
-                    # 第一次调用：check_tasks 查询系统任务
-                    mock_result1 = MagicMock()
-                    mock_result1.fetchall = MagicMock(return_value=[("hash456def",)])
-                    mock_session.execute = AsyncMock(return_value=mock_result1)
-                else:
-                    # 第二次调用：数据库返回的 library_name 在当前配置中不存在
-                    mock_result2 = MagicMock()
-                    mock_result2.scalar_one_or_none = MagicMock(
-                        return_value="不存在的库"
-                    )
-                    mock_session.execute = AsyncMock(return_value=mock_result2)
-
-                mock_ctx = AsyncMock()
-                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-                mock_ctx.__aexit__ = AsyncMock(return_value=None)
-                return mock_ctx
-
-            mock_get_session.side_effect = create_mock_session
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（日韩库）
-            mock_organizer.organize_task.assert_called_once()
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]
-            assert lib_dict["name"] == "日韩库"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_empty_result(self):
-        """场景C: 数据库查询返回空记录 → fallback 到路径匹配"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash789ghi",
-            "name": "无记录任务",
-            "status": 2,
-            "file_id": "55555",
-            "add_time": 1700000000,
-            "path": "/下载/电影/",  # 匹配电影库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "电视剧库"
-        mock_lib1.download_path = "/下载/电视剧"
-        mock_lib1.target_path = "/目标/电视剧"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_lib2 = MagicMock()
-        mock_lib2.name = "电影库"
-        mock_lib2.download_path = "/下载/电影"
-        mock_lib2.target_path = "/目标/电影"
-        mock_lib2.type = "system"
-        mock_lib2.min_transfer_size = 200
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1, mock_lib2]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            call_count = [0]
-
-            def create_mock_session():
-                call_count[0] += 1
-                mock_session = MagicMock()
-
-                if call_count[0] == 1:
-                    # 第一次调用：check_tasks 查询系统任务
-                    mock_result1 = MagicMock()
-                    mock_result1.fetchall = MagicMock(return_value=[("hash789ghi",)])
-                    mock_session.execute = AsyncMock(return_value=mock_result1)
-                else:
-                    # 第二次调用：数据库返回 None（无此记录）
-                    mock_result2 = MagicMock()
-                    mock_result2.scalar_one_or_none = MagicMock(return_value=None)
-                    mock_session.execute = AsyncMock(return_value=mock_result2)
-
-                mock_ctx = AsyncMock()
-                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-                mock_ctx.__aexit__ = AsyncMock(return_value=None)
-                return mock_ctx
-
-            mock_get_session.side_effect = create_mock_session
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（电影库）
-            mock_organizer.organize_task.assert_called_once()
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]
-            assert lib_dict["name"] == "电影库"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_null_library_name(self):
-        """场景D: 数据库查询到记录但 library_name 为 None → fallback"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash000null",
-            "name": "空库名任务",
-            "status": 2,
-            "file_id": "66666",
-            "add_time": 1700000000,
-            "path": "/下载/动漫/",  # 匹配动漫库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "动漫库"
-        mock_lib1.download_path = "/下载/动漫"
-        mock_lib1.target_path = "/目标/动漫"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            call_count = [0]
-
-            def create_mock_session():
-                call_count[0] += 1
-                mock_session = MagicMock()
-
-                if call_count[0] == 1:
-                    # 第一次调用：check_tasks 查询系统任务
-                    mock_result1 = MagicMock()
-                    mock_result1.fetchall = MagicMock(return_value=[("hash000null",)])
-                    mock_session.execute = AsyncMock(return_value=mock_result1)
-                else:
-                    # 第二次调用：数据库返回的 library_name 为 None
-                    mock_result2 = MagicMock()
-                    mock_result2.scalar_one_or_none = MagicMock(return_value=None)
-                    mock_session.execute = AsyncMock(return_value=mock_result2)
-
-                mock_ctx = AsyncMock()
-                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-                mock_ctx.__aexit__ = AsyncMock(return_value=None)
-                return mock_ctx
-
-            mock_get_session.side_effect = create_mock_session
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（动漫库）
-            mock_organizer.organize_task.assert_called_once()
-            # 验证使用的是日韩库（从数据库查询到的）
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]  # 第二个参数是 lib_dict
-            assert lib_dict["name"] == "日韩库"
-            assert lib_dict["target_path"] == "/目标/日韩"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_library_not_in_config(self):
-        """场景B: 数据库查询成功，但 library_name 不在当前配置 → fallback"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash456def",
-            "name": "配置不存在的库",
-            "status": 2,
-            "file_id": "44444",
-            "add_time": 1700000000,
-            "path": "/下载/日韩/",  # 这个路径匹配第二个库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "测试库"
-        mock_lib1.download_path = "/下载/测试"
-        mock_lib1.target_path = "/目标/测试"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_lib2 = MagicMock()
-        mock_lib2.name = "日韩库"
-        mock_lib2.download_path = "/下载/日韩"
-        mock_lib2.target_path = "/目标/日韩"
-        mock_lib2.type = "日韩"
-        mock_lib2.min_transfer_size = 200
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1, mock_lib2]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            call_count = [0]
-
-            def create_mock_session():
-                call_count[0] += 1
-                mock_session = MagicMock()
-                mock_result = MagicMock()
-
-                if call_count[0] == 1:
-                    mock_result.fetchall = MagicMock(return_value=[("hash456def",)])
-                    mock_session.execute = AsyncMock(return_value=mock_result)
-                else:
-                    # 数据库返回的 library_name 在当前配置中不存在
-                    mock_result.scalar_one_or_none = MagicMock(
-                        return_value="不存在的库"
-                    )
-                    mock_session.execute = AsyncMock(return_value=mock_result)
-
-                mock_ctx = AsyncMock()
-                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-                mock_ctx.__aexit__ = AsyncMock(return_value=None)
-                return mock_ctx
-
-            mock_get_session.side_effect = create_mock_session
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（日韩库）
-            mock_organizer.organize_task.assert_called_once()
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]
-            assert lib_dict["name"] == "日韩库"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_empty_result(self):
-        """场景C: 数据库查询返回空记录 → fallback 到路径匹配"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash789ghi",
-            "name": "无记录任务",
-            "status": 2,
-            "file_id": "55555",
-            "add_time": 1700000000,
-            "path": "/下载/电影/",  # 匹配电影库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "电视剧库"
-        mock_lib1.download_path = "/下载/电视剧"
-        mock_lib1.target_path = "/目标/电视剧"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_lib2 = MagicMock()
-        mock_lib2.name = "电影库"
-        mock_lib2.download_path = "/下载/电影"
-        mock_lib2.target_path = "/目标/电影"
-        mock_lib2.type = "system"
-        mock_lib2.min_transfer_size = 200
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1, mock_lib2]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            call_count = [0]
-
-            def create_mock_session():
-                call_count[0] += 1
-                mock_session = MagicMock()
-                mock_result = MagicMock()
-
-                if call_count[0] == 1:
-                    mock_result.fetchall = MagicMock(return_value=[("hash789ghi",)])
-                    mock_session.execute = AsyncMock(return_value=mock_result)
-                else:
-                    # 数据库返回 None（无此记录）
-                    mock_result.scalar_one_or_none = MagicMock(return_value=None)
-                    mock_session.execute = AsyncMock(return_value=mock_result)
-
-                mock_ctx = AsyncMock()
-                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-                mock_ctx.__aexit__ = AsyncMock(return_value=None)
-                return mock_ctx
-
-            mock_get_session.side_effect = create_mock_session
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（电影库）
-            mock_organizer.organize_task.assert_called_once()
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]
-            assert lib_dict["name"] == "电影库"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_null_library_name(self):
-        """场景D: 数据库查询到记录但 library_name 为 None → fallback"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash000null",
-            "name": "空库名任务",
-            "status": 2,
-            "file_id": "66666",
-            "add_time": 1700000000,
-            "path": "/下载/动漫/",  # 匹配动漫库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "动漫库"
-        mock_lib1.download_path = "/下载/动漫"
-        mock_lib1.target_path = "/目标/动漫"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            call_count = [0]
-
-            def create_mock_session():
-                call_count[0] += 1
-                mock_session = MagicMock()
-                mock_result = MagicMock()
-
-                if call_count[0] == 1:
-                    mock_result.fetchall = MagicMock(return_value=[("hash000null",)])
-                    mock_session.execute = AsyncMock(return_value=mock_result)
-                else:
-                    # 数据库返回的 library_name 为 None
-                    mock_result.scalar_one_or_none = MagicMock(return_value=None)
-                    mock_session.execute = AsyncMock(return_value=mock_result)
-
-                mock_ctx = AsyncMock()
-                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-                mock_ctx.__aexit__ = AsyncMock(return_value=None)
-                return mock_ctx
-
-            mock_get_session.side_effect = create_mock_session
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（动漫库）
-            mock_organizer.organize_task.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_exception_fallback(self):
-        """场景E: 数据库查询抛出异常 → catch 异常并 fallback"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hij789exception",
-            "name": "异常测试任务",
-            "status": 2,
-            "file_id": "77777",
-            "add_time": 1700000000,
-            "path": "/下载/音乐/",  # 匹配音乐库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "音乐库"
-        mock_lib1.download_path = "/下载/音乐"
-        mock_lib1.target_path = "/目标/音乐"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            call_count = [0]
-
-            def create_mock_session():
-                call_count[0] += 1
-                mock_session = MagicMock()
-                mock_result = MagicMock()
-
-                if call_count[0] == 1:
-                    mock_result.fetchall = MagicMock(
-                        return_value=[("hij789exception",)]
-                    )
-                    mock_session.execute = AsyncMock(return_value=mock_result)
-                else:
-                    # 第二次调用抛出异常（在 _handle_completed_task 中）
-                    mock_result.scalar_one_or_none = MagicMock(
-                        side_effect=Exception("数据库连接失败")
-                    )
-                    mock_session.execute = AsyncMock(return_value=mock_result)
-
-                mock_ctx = AsyncMock()
-                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-                mock_ctx.__aexit__ = AsyncMock(return_value=None)
-                return mock_ctx
-
-            mock_get_session.side_effect = create_mock_session
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（音乐库）
-            mock_organizer.organize_task.assert_called_once()
-            # 验证使用的是日韩库（从数据库查询到的）
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]  # 第二个参数是 lib_dict
-            assert lib_dict["name"] == "日韩库"
-            assert lib_dict["target_path"] == "/目标/日韩"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_library_not_in_config(self):
-        """场景B: 数据库查询成功，但 library_name 不在当前配置 → fallback"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash456def",
-            "name": "配置不存在的库",
-            "status": 2,
-            "file_id": "44444",
-            "add_time": 1700000000,
-            "path": "/下载/日韩/",  # 这个路径匹配第二个库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "测试库"
-        mock_lib1.download_path = "/下载/测试"
-        mock_lib1.target_path = "/目标/测试"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_lib2 = MagicMock()
-        mock_lib2.name = "日韩库"
-        mock_lib2.download_path = "/下载/日韩"
-        mock_lib2.target_path = "/目标/日韩"
-        mock_lib2.type = "日韩"
-        mock_lib2.min_transfer_size = 200
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1, mock_lib2]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            call_count = [0]
-
-            def create_mock_session():
-                call_count[0] += 1
-                mock_session = MagicMock()
-                mock_result = MagicMock()
-
-                if call_count[0] == 1:
-                    mock_result.fetchall = MagicMock(return_value=[("hash456def",)])
-                    mock_session.execute = AsyncMock(return_value=mock_result)
-                else:
-                    # 数据库返回的 library_name 在当前配置中不存在
-                    mock_result.scalar_one_or_none = MagicMock(
-                        return_value=MagicMock(library_name="不存在的库")
-                    )
-                    mock_session.execute = AsyncMock(return_value=mock_result)
-
-                mock_ctx = AsyncMock()
-                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-                mock_ctx.__aexit__ = AsyncMock(return_value=None)
-                return mock_ctx
-
-            mock_get_session.side_effect = create_mock_session
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（日韩库）
-            mock_organizer.organize_task.assert_called_once()
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]
-            assert lib_dict["name"] == "日韩库"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_empty_result(self):
-        """场景C: 数据库查询返回空记录 → fallback 到路径匹配"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash789ghi",
-            "name": "无记录任务",
-            "status": 2,
-            "file_id": "55555",
-            "add_time": 1700000000,
-            "path": "/下载/电影/",  # 匹配电影库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "电视剧库"
-        mock_lib1.download_path = "/下载/电视剧"
-        mock_lib1.target_path = "/目标/电视剧"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_lib2 = MagicMock()
-        mock_lib2.name = "电影库"
-        mock_lib2.download_path = "/下载/电影"
-        mock_lib2.target_path = "/目标/电影"
-        mock_lib2.type = "system"
-        mock_lib2.min_transfer_size = 200
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1, mock_lib2]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            call_count = [0]
-
-            def create_mock_session():
-                call_count[0] += 1
-                mock_session = MagicMock()
-                mock_result = MagicMock()
-
-                if call_count[0] == 1:
-                    mock_result.fetchall = MagicMock(return_value=[("hash789ghi",)])
-                    mock_session.execute = AsyncMock(return_value=mock_result)
-                else:
-                    # 数据库返回 None（无此记录）
-                    mock_result.scalar_one_or_none = MagicMock(return_value=None)
-                    mock_session.execute = AsyncMock(return_value=mock_result)
-
-                mock_ctx = AsyncMock()
-                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-                mock_ctx.__aexit__ = AsyncMock(return_value=None)
-                return mock_ctx
-
-            mock_get_session.side_effect = create_mock_session
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（电影库）
-            mock_organizer.organize_task.assert_called_once()
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]
-            assert lib_dict["name"] == "电影库"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_null_library_name(self):
-        """场景D: 数据库查询到记录但 library_name 为 None → fallback"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash000null",
-            "name": "空库名任务",
-            "status": 2,
-            "file_id": "66666",
-            "add_time": 1700000000,
-            "path": "/下载/动漫/",  # 匹配动漫库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "动漫库"
-        mock_lib1.download_path = "/下载/动漫"
-        mock_lib1.target_path = "/目标/动漫"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            call_count = [0]
-
-            def create_mock_session():
-                call_count[0] += 1
-                mock_session = MagicMock()
-                mock_result = MagicMock()
-
-                if call_count[0] == 1:
-                    mock_result.fetchall = MagicMock(return_value=[("hash000null",)])
-                    mock_session.execute = AsyncMock(return_value=mock_result)
-                else:
-                    # 数据库返回的 library_name 为 None
-                    mock_result.scalar_one_or_none = MagicMock(
-                        return_value=MagicMock(library_name=None)
-                    )
-                    mock_session.execute = AsyncMock(return_value=mock_result)
-
-                mock_ctx = AsyncMock()
-                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-                mock_ctx.__aexit__ = AsyncMock(return_value=None)
-                return mock_ctx
-
-            mock_get_session.side_effect = create_mock_session
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（动漫库）
-            mock_organizer.organize_task.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_exception_fallback(self):
-        """场景E: 数据库查询抛出异常 → catch 异常并 fallback"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hij789exception",
-            "name": "异常测试任务",
-            "status": 2,
-            "file_id": "77777",
-            "add_time": 1700000000,
-            "path": "/下载/音乐/",  # 匹配音乐库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "音乐库"
-        mock_lib1.download_path = "/下载/音乐"
-        mock_lib1.target_path = "/目标/音乐"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            call_count = [0]
-
-            def create_mock_session():
-                call_count[0] += 1
-                mock_session = MagicMock()
-                mock_result = MagicMock()
-
-                if call_count[0] == 1:
-                    mock_result.fetchall = MagicMock(
-                        return_value=[("hij789exception",)]
-                    )
-                    mock_session.execute = AsyncMock(return_value=mock_result)
-                else:
-                    # 第二次调用抛出异常
-                    mock_session.execute = AsyncMock(
-                        side_effect=Exception("数据库连接失败")
-                    )
-
-                mock_ctx = AsyncMock()
-                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-                mock_ctx.__aexit__ = AsyncMock(return_value=None)
-                return mock_ctx
-
-            mock_get_session.side_effect = create_mock_session
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（音乐库）
-            mock_organizer.organize_task.assert_called_once()
-            # 验证使用的是日韩库（从数据库查询到的）
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]  # 第二个参数是 lib_dict
-            assert lib_dict["name"] == "日韩库"
-            assert lib_dict["target_path"] == "/目标/日韩"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_library_not_in_config(self):
-        """场景B: 数据库查询成功，但 library_name 不在当前配置 → fallback"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash456def",
-            "name": "配置不存在的库",
-            "status": 2,
-            "file_id": "44444",
-            "add_time": 1700000000,
-            "path": "/下载/日韩/",  # 这个路径匹配第二个库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "测试库"
-        mock_lib1.download_path = "/下载/测试"
-        mock_lib1.target_path = "/目标/测试"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_lib2 = MagicMock()
-        mock_lib2.name = "日韩库"
-        mock_lib2.download_path = "/下载/日韩"
-        mock_lib2.target_path = "/目标/日韩"
-        mock_lib2.type = "日韩"
-        mock_lib2.min_transfer_size = 200
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1, mock_lib2]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            mock_session = MagicMock()
-            mock_result = MagicMock()
-            # 数据库返回的 library_name 在当前配置中不存在
-            mock_result.scalar_one_or_none = MagicMock(
-                return_value=MagicMock(library_name="不存在的库")
-            )
-            mock_session.execute = AsyncMock(return_value=mock_result)
-
-            mock_ctx = AsyncMock()
-            mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-            mock_ctx.__aexit__ = AsyncMock(return_value=None)
-            mock_get_session.return_value = mock_ctx
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（日韩库）
-            mock_organizer.organize_task.assert_called_once()
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]
-            assert lib_dict["name"] == "日韩库"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_empty_result(self):
-        """场景C: 数据库查询返回空记录 → fallback 到路径匹配"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash789ghi",
-            "name": "无记录任务",
-            "status": 2,
-            "file_id": "55555",
-            "add_time": 1700000000,
-            "path": "/下载/电影/",  # 匹配电影库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "电视剧库"
-        mock_lib1.download_path = "/下载/电视剧"
-        mock_lib1.target_path = "/目标/电视剧"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_lib2 = MagicMock()
-        mock_lib2.name = "电影库"
-        mock_lib2.download_path = "/下载/电影"
-        mock_lib2.target_path = "/目标/电影"
-        mock_lib2.type = "system"
-        mock_lib2.min_transfer_size = 200
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1, mock_lib2]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            mock_session = MagicMock()
-            mock_result = MagicMock()
-            # 数据库返回 None（无此记录）
-            mock_result.scalar_one_or_none = MagicMock(return_value=None)
-            mock_session.execute = AsyncMock(return_value=mock_result)
-
-            mock_ctx = AsyncMock()
-            mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-            mock_ctx.__aexit__ = AsyncMock(return_value=None)
-            mock_get_session.return_value = mock_ctx
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（电影库）
-            mock_organizer.organize_task.assert_called_once()
-            call_args = mock_organizer.organize_task.call_args
-            lib_dict = call_args[0][1]
-            assert lib_dict["name"] == "电影库"
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_null_library_name(self):
-        """场景D: 数据库查询到记录但 library_name 为 None → fallback"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hash000null",
-            "name": "空库名任务",
-            "status": 2,
-            "file_id": "66666",
-            "add_time": 1700000000,
-            "path": "/下载/动漫/",  # 匹配动漫库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "动漫库"
-        mock_lib1.download_path = "/下载/动漫"
-        mock_lib1.target_path = "/目标/动漫"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            mock_session = MagicMock()
-            mock_result = MagicMock()
-            # 数据库返回的 library_name 为 None
-            mock_result.scalar_one_or_none = MagicMock(
-                return_value=MagicMock(library_name=None)
-            )
-            mock_session.execute = AsyncMock(return_value=mock_result)
-
-            mock_ctx = AsyncMock()
-            mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-            mock_ctx.__aexit__ = AsyncMock(return_value=None)
-            mock_get_session.return_value = mock_ctx
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（动漫库）
-            mock_organizer.organize_task.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_db_lookup_exception_fallback(self):
-        """场景E: 数据库查询抛出异常 → catch 异常并 fallback"""
-        from app.tasks.monitor import TaskMonitor
-
-        completed_task = {
-            "info_hash": "hij789exception",
-            "name": "异常测试任务",
-            "status": 2,
-            "file_id": "77777",
-            "add_time": 1700000000,
-            "path": "/下载/音乐/",  # 匹配音乐库
-        }
-
-        mock_client = AsyncMock()
-        mock_client.get_offline_tasks = AsyncMock(
-            return_value={"state": True, "tasks": [completed_task]}
-        )
-        mock_client.get_path_id = AsyncMock(return_value="12345")
-
-        mock_organizer = AsyncMock()
-        mock_organizer.organize_task = AsyncMock(
-            return_value={
-                "success_count": 1,
-                "failed_count": 0,
-                "skipped_count": 0,
-                "errors": [],
-            }
-        )
-
-        mock_lib1 = MagicMock()
-        mock_lib1.name = "音乐库"
-        mock_lib1.download_path = "/下载/音乐"
-        mock_lib1.target_path = "/目标/音乐"
-        mock_lib1.type = "system"
-        mock_lib1.min_transfer_size = 100
-
-        mock_config = MagicMock()
-        mock_config.p115.rotation_training_interval_min = 1
-        mock_config.p115.rotation_training_interval_max = 2
-        mock_config.media.libraries = [mock_lib1]
-        mock_config.media.video_formats = ["mp4", "mkv"]
-        mock_config.media.min_transfer_size = 100
-        mock_config.media.xx = MagicMock(remove_keywords=[])
-
-        monitor = TaskMonitor(
-            p115_client=mock_client,
-            file_organizer=mock_organizer,
-            config=mock_config,
-        )
-
-        with patch("app.tasks.monitor.get_session") as mock_get_session:
-            call_count = [0]
-
-            def create_mock_session():
-                call_count[0] += 1
-                mock_session = MagicMock()
-
-                if call_count[0] == 1:
-                    # 第一次调用：check_tasks 查询系统任务（正常返回）
-                    mock_result1 = MagicMock()
-                    mock_result1.fetchall = MagicMock(
-                        return_value=[("hij789exception",)]
-                    )
-                    mock_session.execute = AsyncMock(return_value=mock_result1)
-                else:
-                    # 第二次调用：_handle_completed_task 查询 library_name（抛出异常）
-                    mock_session.execute = AsyncMock(
-                        side_effect=Exception("数据库连接失败")
-                    )
-
-                mock_ctx = AsyncMock()
-                mock_ctx.__aenter__ = AsyncMock(return_value=mock_session)
-                mock_ctx.__aexit__ = AsyncMock(return_value=None)
-                return mock_ctx
-
-            mock_get_session.side_effect = create_mock_session
-
-            await monitor.check_tasks()
-
-            # 应该 fallback 到路径匹配（音乐库）
-            mock_organizer.organize_task.assert_called_once()
+        result = monitor._find_library_by_name("日韩库")
+        assert result is not None
+        assert result.target_path == "/目标/日韩"
+        assert monitor._find_library_by_name("不存在的库") is None